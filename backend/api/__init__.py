@@ -8,7 +8,9 @@ api_router = APIRouter(prefix="/api")
 from .feature_selection import router as feature_selection_router
 from .health import router as health_router
 from .data_management import router as data_management_router
+from .jobs import router as jobs_router
 
 api_router.include_router(feature_selection_router, tags=["Feature Selection"])
 api_router.include_router(health_router, tags=["Health"])
-api_router.include_router(data_management_router, tags=["Data Management"])
\ No newline at end of file
+api_router.include_router(data_management_router, tags=["Data Management"])
+api_router.include_router(jobs_router, tags=["Jobs"])
\ No newline at end of file
@@ -1,69 +1,100 @@
 
-from fastapi import APIRouter, File, UploadFile, HTTPException
+import os
+import uuid
+from fastapi import APIRouter, File, UploadFile, HTTPException, Query
 from fastapi.responses import JSONResponse
-import pandas as pd
-from pathlib import Path
-import shutil
-from typing import List
-from ..config import UPLOAD_DIR, logger
+from ..config import UPLOAD_DIR, INGEST_CACHE_DIR, logger
+from ..uploads import save_upload
+from ..dataset_index import dataset_index
 
 router = APIRouter()
 
 @router.post("/upload")
 async def upload_dataset(file: UploadFile = File(...)):
     """Upload a dataset file and get basic metadata."""
+    from utils.data import inspect_csv, save_raw_metadata
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
 
-    temp_path = UPLOAD_DIR / file.filename
+    dest = UPLOAD_DIR / file.filename
+    # يُحفظ ويُفحص باسم مؤقت؛ ملف موجود بنفس الاسم لا يُستبدل إلا برفع صالح
+    temp_path = UPLOAD_DIR / f".{uuid.uuid4().hex}.upload"
     try:
-        content = await file.read()
-        if len(content) > 50 * 1024 * 1024:  # 50MB limit
-            raise HTTPException(status_code=400, detail="File too large. Maximum size is 50MB")
+        file_hash = await save_upload(file, temp_path)
 
-        with temp_path.open("wb") as f:
-            f.write(content)
-
-        # Validate CSV
-        df = pd.read_csv(temp_path)
-        if df.empty:
+        # Validate CSV (chunked, so memory does not grow with the file)
+        meta = inspect_csv(temp_path)
+        if meta["rows"] == 0:
             raise ValueError("CSV file is empty")
+        os.replace(temp_path, dest)
+        save_raw_metadata(INGEST_CACHE_DIR, file_hash, meta)
+        dataset_index.put(dest, meta, file_hash)
 
         # Return metadata
         return JSONResponse({
             "filename": file.filename,
-            "rows": len(df),
-            "columns": len(df.columns),
-            "column_names": list(df.columns),
-            "sample_data": df.head().to_dict(orient='records')
+            "rows": meta["rows"],
+            "columns": meta["columns"],
+            "column_names": meta["column_names"],
+            "dtypes": meta["dtypes"],
+            "sample_data": meta["sample"]
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 @router.get("/datasets")
-async def list_datasets():
-    """List all uploaded datasets."""
+async def list_datasets(offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    """List uploaded datasets, sorted by name, one page at a time."""
+    from utils.data import file_sha256, inspect_csv, load_raw_metadata, save_raw_metadata
+    files = sorted(UPLOAD_DIR.glob("*.csv"), key=lambda f: f.name)
+    dataset_index.prune(f.name for f in files)
     datasets = []
-    for file in UPLOAD_DIR.glob("*.csv"):
-        df = pd.read_csv(file)
+    for file in files[offset:offset + limit]:
+        stat = file.stat()
+        entry = dataset_index.get(file, stat)
+        if entry is None:
+            # غير مفهرس أو تغيّر على القرص: يُفحص مرة واحدة ثم يُحفظ في الفهرس
+            file_hash = file_sha256(file)
+            meta = load_raw_metadata(INGEST_CACHE_DIR, file_hash)
+            if meta is None:
+                meta = inspect_csv(file)
+                save_raw_metadata(INGEST_CACHE_DIR, file_hash, meta)
+            entry = dataset_index.put(file, meta, file_hash)
         datasets.append({
             "name": file.stem,
-            "size": file.stat().st_size,
-            "rows": len(df),
-            "columns": len(df.columns)
+            "size": stat.st_size,
+            "rows": entry["rows"],
+            "columns": entry["columns"]
         })
-    return {"datasets": datasets}
+    return {"datasets": datasets, "total": len(files), "offset": offset, "limit": limit}
+
+def _file_hash(file) -> str:
+    from utils.data import file_sha256
+    entry = dataset_index.get(file)
+    return entry["file_hash"] if entry and entry.get("file_hash") else file_sha256(file)
 
 @router.delete("/dataset/{filename}")
 async def delete_dataset(filename: str):
     """Delete an uploaded dataset."""
+    from utils.data import purge_ingest_cache
     file_path = UPLOAD_DIR / filename
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Dataset not found")
     try:
+        file_hash = _file_hash(file_path)
+        size = file_path.stat().st_size
         file_path.unlink()
+        dataset_index.remove(file_path.name)
+        # المصفوفات المرمَّزة تُحذف معه، إلا إذا بقي ملف آخر بنفس المحتوى
+        others = (f for f in UPLOAD_DIR.glob("*.csv") if f.stat().st_size == size)
+        if not any(_file_hash(f) == file_hash for f in others):
+            purge_ingest_cache(INGEST_CACHE_DIR, file_hash)
         return {"message": f"Dataset '{filename}' deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete dataset: {str(e)}")
\ No newline at end of file
@@ -1,21 +1,25 @@
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Request
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException
 from fastapi.responses import JSONResponse
 from pathlib import Path
 import time
-import pandas as pd
-import shutil
-import requests
-import sys
+import uuid
 from typing import Optional
-from utils.data import prepare_data_for_example
-from utils.comparison import get_model_factory, run_comparison_method
-from utils.plotting import plot_results, plot_comparisons
-from utils.ga_optimized import run_ga as run_ga_optimized
-from utils.ga_original import run_ga as run_ga_original
-from ..config import logger, UPLOAD_DIR, OUTPUT_BASE
+from utils.charts import chart_series
+from utils.timing import LatencyHistogram, StageTimer
+from ..config import (
+    logger, UPLOAD_DIR, OUTPUT_BASE, INGEST_CACHE_DIR, INGEST_CACHE_MAX_BYTES, COMPARISON_OVERLAP, JOB_MEMORY_MB, MIN_JOB_MEMORY_MB,
+    PLOT_RENDERING, ALLOW_PROFILING
+)
+from ..jobs import job_manager
+from ..metrics import metrics
+from ..plot_renderer import save_chart_data, load_chart_data, schedule_render
+from ..result_cache import ResultStore, result_store
+from ..uploads import save_upload, download_to_file
 
 router = APIRouter()
 
+SEED = 42
+
 @router.post("/run")
 async def run_feature_selection(
     file: UploadFile = File(None),
@@ -29,10 +33,18 @@ async def run_feature_selection(
     cv: int = Form(3),
     model_type: str = Form("linear"),
     ga_version: str = Form("optimized"),
+    crossover: str = Form("one_point"),
+    surrogate: str = Form(None),
+    multi_fidelity: bool = Form(False),
     mode: str = Form("all"),
-    methods: list = Form([])
+    methods: list = Form([]),
+    use_cache: bool = Form(True),
+    memory_mb: int = Form(None),
+    profile: bool = Form(False)
 ):
-    """Run genetic algorithm feature selection with comparison methods."""
+    """Queue a genetic algorithm feature selection run; returns a job id to poll."""
+    from utils.ga_optimized import CROSSOVER_METHODS
+    from utils.surrogate import SURROGATE_MODELS
     logger.info(f"Starting feature selection: problem_type={problem_type}, pop_size={pop_size}, generations={generations}, ga_version={ga_version}")
 
     # ===== INPUT VALIDATION =====
@@ -52,56 +64,172 @@ async def run_feature_selection(
         raise HTTPException(status_code=400, detail="CV folds must be between 2 and 10")
     if problem_type not in ["regression", "classification"]:
         raise HTTPException(status_code=400, detail="Problem type must be 'regression' or 'classification'")
+    if crossover not in CROSSOVER_METHODS:
+        raise HTTPException(status_code=400, detail=f"Crossover must be one of: {', '.join(CROSSOVER_METHODS)}")
+    surrogate = surrogate or None
+    if surrogate is not None and surrogate not in SURROGATE_MODELS:
+        raise HTTPException(status_code=400, detail=f"Surrogate must be one of: {', '.join(SURROGATE_MODELS)}")
+    if surrogate is not None and ga_version != "optimized":
+        raise HTTPException(status_code=400, detail="Surrogate screening is only available with ga_version=optimized")
+    if multi_fidelity and ga_version != "optimized":
+        raise HTTPException(status_code=400, detail="Multi-fidelity screening is only available with ga_version=optimized")
+    if memory_mb is not None and not (MIN_JOB_MEMORY_MB <= memory_mb <= JOB_MEMORY_MB):
+        raise HTTPException(status_code=400, detail=f"Memory budget must be between {MIN_JOB_MEMORY_MB} and {JOB_MEMORY_MB} MB")
     if file and not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    if profile and not ALLOW_PROFILING:
+        raise HTTPException(status_code=403, detail="Profiling is disabled on this server")
 
+    # ===== FILE HANDLING =====
+    # اسم فريد لكل تشغيل حتى لا تتصادم المهام المتزامنة على نفس الملف
     temp_path = None
+    file_hash = None
+    upload_seconds = None
+    if file:
+        logger.info(f"Uploading file: {file.filename}")
+        ds_name = Path(file.filename).stem
+        temp_path = UPLOAD_DIR / f"{uuid.uuid4().hex}_{Path(file.filename).name}"
+        t0 = time.perf_counter()
+        file_hash = await save_upload(file, temp_path)
+        upload_seconds = time.perf_counter() - t0
+    else:
+        ds_name = "downloaded"
+
+    params = {
+        "url": url,
+        "ds_name": ds_name,
+        "target_column": target_column,
+        "problem_type": problem_type,
+        "pop_size": pop_size,
+        "generations": generations,
+        "mutation_rate": mutation_rate,
+        "crossover_rate": crossover_rate,
+        "cv": cv,
+        "model_type": model_type,
+        "ga_version": ga_version,
+        "crossover": crossover,
+        "surrogate": surrogate,
+        "multi_fidelity": multi_fidelity,
+        "mode": mode,
+        "methods": methods,
+        "use_cache": use_cache,
+        "memory_mb": memory_mb or JOB_MEMORY_MB,
+        "profile": profile
+    }
+    job = job_manager.submit(execute_feature_selection, temp_path, params, file_hash, upload_seconds=upload_seconds,
+                             description=ds_name)
+    return JSONResponse(status_code=202, content={
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "result_url": f"/api/jobs/{job.id}/result"
+    })
+
+def execute_feature_selection(job, temp_path: Optional[Path], params: dict, file_hash: Optional[str] = None,
+                              upload_seconds: Optional[float] = None) -> dict:
+    """Run GA and comparison methods for one job (executed off the event loop)."""
+    # المكتبات الثقيلة تُستورد هنا لا عند بدء الخادم (انظر backend/warmup.py)
+    import pandas as pd
+    from utils.data import ingest_dataset, inspect_csv, load_raw_metadata, save_raw_metadata
+    from utils.comparison import get_model_factory, ComparisonScheduler
+    from utils.ga_optimized import run_ga as run_ga_optimized
+    from utils.ga_original import run_ga as run_ga_original
+    from utils.ga_islands import run_island_ga
+    from utils.memory import RssMonitor
+    from utils.profiling import RunProfiler, PROFILE_FILE, REPORT_FILE
+
+    problem_type = params["problem_type"]
+    model_type = params["model_type"]
+    cv = params["cv"]
+    pop_size = params["pop_size"]
+    generations = params["generations"]
+    ds_name = params["ds_name"]
+    scheduler = None
+    profiler = None
+    rss = RssMonitor().start()
+    # ثواني كل مرحلة لهذا التشغيل: تُعاد في metadata.timings وتُضاف إلى /metrics
+    timer = StageTimer()
+    if upload_seconds is not None:
+        timer.add("upload", upload_seconds)
     try:
-        # ===== FILE HANDLING =====
-        if file:
-            logger.info(f"Uploading file: {file.filename}")
-            temp_path = UPLOAD_DIR / file.filename
-            file_content = await file.read()
-            if len(file_content) > 50 * 1024 * 1024:
-                raise HTTPException(status_code=400, detail="File too large. Maximum size is 50MB")
-            with temp_path.open("wb") as f:
-                f.write(file_content)
-        elif url:
-            logger.info(f"Downloading from URL: {url}")
-            try:
-                resp = requests.get(url, timeout=30)
-                resp.raise_for_status()
-            except requests.exceptions.Timeout:
-                raise HTTPException(status_code=400, detail="URL request timed out")
-            except requests.exceptions.RequestException as e:
-                raise HTTPException(status_code=400, detail=f"Failed to download from URL: {str(e)}")
-            temp_path = UPLOAD_DIR / "downloaded.csv"
-            temp_path.write_bytes(resp.content)
+        if temp_path is None:
+            job.set_stage("downloading")
+            logger.info(f"Downloading from URL: {params['url']}")
+            temp_path = UPLOAD_DIR / f"{uuid.uuid4().hex}_downloaded.csv"
+            with timer.stage("download"):
+                file_hash = download_to_file(params["url"], temp_path)
+
+        # ===== RESULT CACHE =====
+        # نفس الملف ونفس المعاملات => نفس النتيجة (البذرة ثابتة)
+        cache_params = {k: v for k, v in params.items() if k not in ("url", "use_cache", "profile")}
+        cache_params["seed"] = SEED
+        cache_key = ResultStore.make_key(file_hash, cache_params)
+        run_id = cache_key[:16]
+        out_dir = OUTPUT_BASE / ds_name / run_id
+        # التشغيل المُحلَّل يُنفَّذ دائمًا (لا يُرجع نتيجة مخزنة)
+        if params["use_cache"] and not params["profile"]:
+            cached = result_store.get(cache_key)
+            metrics.inc("fs_result_cache_requests_total", result="hit" if cached is not None else "miss")
+            if cached is not None:
+                logger.info(f"Result cache hit for {ds_name} ({cache_key[:12]})")
+                job.add_event("cache", hit=True, key=cache_key)
+                return {**cached, "cached": True}
+
+        # ===== PROFILING =====
+        # بدون profile لا يُنشأ أي مُحلِّل ولا تُمرَّر profile_dir، فلا كلفة إضافية
+        if params["profile"]:
+            profiler = RunProfiler(out_dir).start()
+            logger.info(f"Profiling run {run_id}")
 
         # ===== CSV VALIDATION =====
-        try:
-            df_check = pd.read_csv(temp_path, nrows=5)
-            if df_check.empty:
-                raise ValueError("CSV file is empty")
-            logger.info(f"CSV validated: {df_check.shape[1]} columns, {len(pd.read_csv(temp_path))} rows")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error reading CSV: {str(e)}")
+        # قراءة مجزأة: الذاكرة محدودة مهما كان حجم الملف، ولا تتكرر لنفس المحتوى
+        job.raise_if_cancelled()
+        job.set_stage("validating")
+        if load_raw_metadata(INGEST_CACHE_DIR, file_hash) is None:
+            try:
+                with timer.stage("validate"):
+                    raw = inspect_csv(temp_path)
+            except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+                raise HTTPException(status_code=400, detail=f"Error reading CSV: {str(e)}")
+            if raw["rows"] == 0:
+                raise HTTPException(status_code=400, detail="Error reading CSV: CSV file is empty")
+            save_raw_metadata(INGEST_CACHE_DIR, file_hash, raw)
+            logger.info(f"CSV validated: {raw['columns']} columns, {raw['rows']} rows")
 
         # ===== DATA PREPARATION =====
+        # يُحلَّل CSV ويُرمَّز مرة واحدة لكل محتوى ملف، ثم يُقرأ من ذاكرة التخزين
+        job.raise_if_cancelled()
+        job.set_stage("preparing")
+        target_column = params["target_column"]
         try:
-            X, y = prepare_data_for_example(
-                str(temp_path),
-                group_top=10,
-                drop_numeric_features=False,
-                target=target_column.strip() if target_column else None
-            )
-            logger.info(f"Data prepared: X shape={X.shape}, y shape={y.shape}")
+            with timer.stage("ingest"):
+                X, y, ingest_info = ingest_dataset(
+                    temp_path,
+                    INGEST_CACHE_DIR,
+                    group_top=10,
+                    drop_numeric_features=False,
+                    target=target_column.strip() if target_column else None,
+                    file_hash=file_hash,
+                    memory_budget=params["memory_mb"] * 1024 * 1024,
+                    max_cache_bytes=INGEST_CACHE_MAX_BYTES
+                )
+            raw = ingest_info["raw"]
+            if raw["rows"] == 0:
+                raise ValueError("CSV file is empty")
+            logger.info(f"CSV ingested: {raw['columns']} columns, {raw['rows']} rows (cache hit: {ingest_info['cache_hit']})")
+            logger.info(f"Data prepared: X shape={X.shape}, y shape={y.shape}, sparse={ingest_info['sparse']}")
+            memory_plan = ingest_info["memory"]
+            if memory_plan["dtype"] != "float64" or memory_plan["max_rows"] is not None:
+                logger.info(f"Memory budget {params['memory_mb']}MB: dtype={memory_plan['dtype']}, "
+                            f"rows {memory_plan['encoded_rows']} -> {X.shape[0]}")
             if X.shape[0] < cv:
                 raise ValueError(f"Dataset has {X.shape[0]} rows, need at least {cv} for {cv}-fold CV")
             if X.shape[1] < 2:
                 raise ValueError(f"Dataset has only {X.shape[1]} feature(s). Need at least 2 features.")
         except FileNotFoundError:
             raise HTTPException(status_code=400, detail="CSV file not found")
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Error reading CSV: {str(e)}")
         except KeyError as e:
             raise HTTPException(status_code=400, detail=f"Target column not found: {str(e)}")
         except ValueError as e:
@@ -111,57 +239,103 @@ async def run_feature_selection(
             raise HTTPException(status_code=400, detail=f"Error processing data: {str(e)}")
 
         # ===== SELECT GA IMPLEMENTATION =====
-        if ga_version == "optimized":
+        if params["ga_version"] == "optimized":
             run_ga = run_ga_optimized
+        elif params["ga_version"] == "islands":
+            run_ga = run_island_ga
         else:
             run_ga = run_ga_original
 
         # ===== RUN GENETIC ALGORITHM =====
+        job.raise_if_cancelled()
+        job.set_stage("ga", n_samples=X.shape[0], n_features=X.shape[1])
         is_classification = (problem_type.strip().lower() == "classification")
         scoring = 'accuracy' if is_classification else 'neg_mean_squared_error'
         model_factory = get_model_factory(model_type, is_classification=is_classification)
+
+        # زمن كل جيل من فرق elapsed بين الاستدعاءات؛ الجيل الأول يشمل تهيئة GA (العينة، مجمع العمليات)
+        generation_seconds = []
+
+        def on_generation(info):
+            seconds = info["elapsed"] - sum(generation_seconds)
+            generation_seconds.append(seconds)
+            metrics.inc("fs_ga_generations_total", ga_version=params["ga_version"])
+            metrics.observe("fs_ga_generation_duration_seconds", seconds, ga_version=params["ga_version"])
+            score = -info["best_fitness"] if is_classification else info["best_fitness"]
+            job.add_event("generation", total_generations=generations, best_score=score, **info)
+            job.update_progress(generation=info["generation"], best_score=score,
+                                evaluations=info["evaluations"], cache_hits=info["cache_hits"])
+
+        # ===== COMPARISON SCHEDULER =====
+        # الترتيبات التي لا تعتمد على k تبدأ أثناء GA وتأخذ جزءًا من الأنوية
+        all_methods = ["SelectKBest", "LassoCV", "RFE", "VarianceThreshold", "MutualInfo_topK", "RandomForest_topK"]
+        methods_to_run = all_methods if params["mode"] == "all" else [m for m in params["methods"] if m in all_methods]
+        profile_dir = str(profiler.parts_dir) if profiler is not None else None
+        scheduler = ComparisonScheduler(X, y, model_factory, cv, is_classification=is_classification,
+                                        seed=SEED, methods=methods_to_run, profile_dir=profile_dir)
+        ga_kwargs = {"crossover": params["crossover"]} if run_ga is not run_ga_original else {}
+        if profile_dir is not None and run_ga is not run_ga_original:
+            ga_kwargs["profile_dir"] = profile_dir
+        if params.get("surrogate") and run_ga is run_ga_optimized:
+            ga_kwargs["surrogate"] = params["surrogate"]
+        if params.get("multi_fidelity") and run_ga is run_ga_optimized:
+            ga_kwargs["multi_fidelity"] = True
+        if COMPARISON_OVERLAP and methods_to_run:
+            scheduler.start_rankings(should_stop=job.is_cancelled)
+            if run_ga is not run_ga_original:
+                ga_kwargs["n_jobs"] = max(1, scheduler.core_budget - scheduler.prefetch_workers)
+
         logger.info("Starting Genetic Algorithm...")
         t0 = time.perf_counter()
         try:
-            best_genome, best_score, history = run_ga(
+            best_genome, best_score, history, ga_stats = run_ga(
                 X, y, model_factory,
                 pop_size=pop_size,
                 generations=generations,
-                mutation_rate=mutation_rate,
-                crossover_rate=crossover_rate,
+                mutation_rate=params["mutation_rate"],
+                crossover_rate=params["crossover_rate"],
                 cv=cv,
-                seed=42,
+                seed=SEED,
                 verbose=False,
-                scoring=scoring
+                scoring=scoring,
+                should_stop=job.is_cancelled,
+                progress_callback=on_generation,
+                **ga_kwargs
             )
             ga_time = time.perf_counter() - t0
+            timer.add("ga", ga_time)
             ga_selected = [col for bit, col in zip(best_genome, X.columns) if bit]
             logger.info(f"GA completed in {ga_time:.2f}s. Selected {len(ga_selected)} features. Best score: {best_score:.4f}")
         except Exception as e:
             logger.error(f"GA execution failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Genetic Algorithm failed: {str(e)}")
+        job.raise_if_cancelled()
+        metrics.inc("fs_fitness_evaluations_total", ga_stats["evaluations"], ga_version=params["ga_version"])
+        if ga_stats.get("fitness_latency"):
+            metrics.merge("fs_fitness_evaluation_seconds", LatencyHistogram.from_dict(ga_stats["fitness_latency"]),
+                          ga_version=params["ga_version"])
 
         # ===== RUN COMPARISON METHODS =====
-        all_methods = ["SelectKBest", "LassoCV", "RFE", "VarianceThreshold", "MutualInfo_topK", "RandomForest_topK"]
-        methods_to_run = all_methods if mode == "all" else [m for m in methods if m in all_methods]
         k = max(1, len(ga_selected))
         logger.info(f"Running {len(methods_to_run)} comparison methods...")
+        job.set_stage("comparisons", methods_total=len(methods_to_run), methods_done=0)
         results = {"GA": {"selected": ga_selected, "mse": best_score if not is_classification else -best_score, "time": ga_time}}
-        for method in methods_to_run:
-            try:
-                res = run_comparison_method(method, X, y, k, model_factory, cv, is_classification=is_classification)
-                results[method] = res
-                logger.info(f"{method}: {len(res['selected'])} features, score={res['mse']:.4f}, time={res['time']:.2f}s")
-            except Exception as e:
-                logger.error(f"Method {method} failed: {str(e)}")
-                results[method] = {"selected": [], "mse": None, "time": 0.0, "error": str(e)}
-
-        # ===== GENERATE PLOTS =====
-        ds_name = temp_path.stem
-        out_dir = OUTPUT_BASE / ds_name
-        if out_dir.exists():
-            shutil.rmtree(out_dir)
-        out_dir.mkdir(exist_ok=True)
+        methods_done = []
+
+        def on_method_done(method, res):
+            methods_done.append(method)
+            score = f"{res['mse']:.4f}" if res['mse'] is not None else "N/A"
+            logger.info(f"{method}: {len(res['selected'])} features, score={score}, time={res['time']:.2f}s")
+            metrics.observe("fs_comparison_duration_seconds", res['time'], method=method)
+            job.update_progress(methods_done=len(methods_done))
+
+        with timer.stage("comparisons"):
+            results.update(scheduler.run(k, should_stop=job.is_cancelled, on_result=on_method_done))
+
+        # ===== CHART RECORD =====
+        # الرسوم لا تُرسم هنا: يُحفظ سجل مضغوط وتُرسم عند أول طلب لها (أو في الخلفية)
+        job.raise_if_cancelled()
+        job.set_stage("saving")
         parsed = {
             'gen_mse': history,
             'best_mse': best_score if not is_classification else -best_score,
@@ -173,51 +347,81 @@ async def run_feature_selection(
             },
             'is_classification': is_classification
         }
-        try:
-            logger.info("Generating plots...")
-            plot_results(parsed, out_dir, ds_name=ds_name)
-            plot_comparisons(parsed, out_dir, ds_name=ds_name)
-            logger.info("Plots generated successfully")
-        except Exception as e:
-            logger.error(f"Plot generation failed: {str(e)}")
+        with timer.stage("chart_record"):
+            save_chart_data(out_dir, ds_name, parsed)
+        if PLOT_RENDERING == "background":
+            schedule_render(out_dir)
 
         metric_suffix = "accuracy" if is_classification else "mse"
+        plot_base = f"/outputs/{ds_name}/{run_id}"
         plots = [
-            f"/outputs/{ds_name}/ga_{metric_suffix}_per_gen_{ds_name}.png",
-            f"/outputs/{ds_name}/comparison_{metric_suffix}_{ds_name}.png",
-            f"/outputs/{ds_name}/comparison_jaccard_{ds_name}.png",
-            f"/outputs/{ds_name}/comparison_time_vs_{metric_suffix}_{ds_name}.png",
-            f"/outputs/{ds_name}/comparison_counts_{ds_name}.png"
+            f"{plot_base}/ga_{metric_suffix}_per_gen_{ds_name}.png",
+            f"{plot_base}/comparison_{metric_suffix}_{ds_name}.png",
+            f"{plot_base}/comparison_jaccard_{ds_name}.png",
+            f"{plot_base}/comparison_time_vs_{metric_suffix}_{ds_name}.png",
+            f"{plot_base}/comparison_counts_{ds_name}.png"
         ]
 
         logger.info("Feature selection completed successfully")
-        return JSONResponse({
+        response = {
             "dataset": ds_name,
+            "run_id": run_id,
             "model_type": model_type,
             "problem_type": problem_type,
             "results": results,
             "plots": plots,
+            "chart_data_url": f"/api/charts/{ds_name}/{run_id}",
             "metadata": {
                 "n_samples": X.shape[0],
                 "n_features": X.shape[1],
+                "sparse": ingest_info["sparse"],
+                "preprocessing": {"cache_hit": ingest_info["cache_hit"], "timings": ingest_info["prep_timings"]},
                 "cv_folds": cv,
                 "pop_size": pop_size,
                 "generations": generations,
-                "total_time": sum(r['time'] for r in results.values())
+                "total_time": sum(r['time'] for r in results.values()),
+                "ga_stats": ga_stats,
+                "memory": {**memory_plan, **rss.stop()},
+                "timings": {
+                    "stages": dict(timer.timings),
+                    "ingest": ingest_info["timings"],
+                    "generations": generation_seconds,
+                    "fitness": {"evaluations": ga_stats["evaluations"], "latency": ga_stats.get("fitness_latency")},
+                    "comparisons": {m: r["time"] for m, r in results.items() if m != "GA"}
+                }
             }
-        })
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please check your data and try again.")
+        }
+        if profiler is None:
+            result_store.put(cache_key, response, out_dir)
+        else:
+            # التوقيتات تحت cProfile مضخَّمة والملخص خاص بهذا التشغيل: لا يُخزَّن في ذاكرة النتائج
+            profile_summary = profiler.stop()
+            response["profile"] = {
+                **profile_summary,
+                "profile_url": f"{plot_base}/{PROFILE_FILE}",
+                "report_url": f"{plot_base}/{REPORT_FILE}"
+            }
+        return {**response, "cached": False}
     finally:
+        rss.stop()
+        if profiler is not None:
+            profiler.stop()
+        for stage, seconds in timer.timings.items():
+            metrics.observe("fs_stage_duration_seconds", seconds, stage=stage)
+        if scheduler is not None:
+            scheduler.close()
         if temp_path and temp_path.exists():
             try:
                 temp_path.unlink()
                 logger.info("Temporary file cleaned up")
             except Exception as e:
                 logger.warning(f"Failed to delete temp file: {str(e)}")
-                
-                
+
+@router.get("/charts/{ds_name}/{run_id}")
+async def get_chart_data(ds_name: str, run_id: str):
+    """Chart series of a finished run (GA history, per-method score / count / time / overlap) for client-side drawing."""
+    out_dir = (OUTPUT_BASE / ds_name / run_id).resolve()
+    record = load_chart_data(out_dir) if OUTPUT_BASE.resolve() in out_dir.parents else None
+    if record is None:
+        raise HTTPException(status_code=404, detail="Chart data not found")
+    return {"dataset": record["dataset"], "run_id": run_id, **chart_series(record["parsed"])}
@@ -1,8 +1,16 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ..warmup import warmup
 
 router = APIRouter()
 
 @router.get("/health")
 async def health_check():
     """Health check endpoint for monitoring."""
-    return {"status": "healthy", "service": "Genetic Feature Selection API", "version": "1.0.0"}
\ No newline at end of file
+    return {"status": "healthy", "service": "Genetic Feature Selection API", "version": "1.0.0"}
+
+@router.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the scientific stack has been imported in the background."""
+    state = warmup.to_dict()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content={"status": "ready" if state["ready"] else "warming", **state})
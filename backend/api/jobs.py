@@ -0,0 +1,70 @@
+import asyncio
+import json
+import time
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from ..jobs import job_manager, COMPLETED, FAILED, CANCELLED
+
+SSE_POLL_INTERVAL = 0.5
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+router = APIRouter()
+
+def _get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Report status, current stage and progress of a feature-selection job."""
+    return _get_job(job_id).to_dict()
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Stream stage changes and per-generation GA progress as Server-Sent Events."""
+    job = _get_job(job_id)
+
+    async def event_stream():
+        sent = 0
+        last_write = time.monotonic()
+        while True:
+            finished = job.finished
+            events = job.events_since(sent)
+            for event in events:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            sent += len(events)
+            if events:
+                last_write = time.monotonic()
+            if finished:
+                yield f"event: end\ndata: {json.dumps(job.to_dict())}\n\n"
+                return
+            if time.monotonic() - last_write > SSE_KEEPALIVE_INTERVAL:
+                yield ": keep-alive\n\n"
+                last_write = time.monotonic()
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Return the result of a completed job."""
+    job = _get_job(job_id)
+    if job.status == COMPLETED:
+        return JSONResponse(job.result)
+    if job.status == FAILED:
+        raise HTTPException(status_code=job.status_code or 500, detail=job.error)
+    if job.status == CANCELLED:
+        raise HTTPException(status_code=409, detail="Job was cancelled")
+    raise HTTPException(status_code=409, detail=f"Job is still {job.status}")
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one at the next generation/stage boundary."""
+    _get_job(job_id)
+    return job_manager.cancel(job_id).to_dict()
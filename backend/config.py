@@ -1,14 +1,20 @@
 import logging
+import os
 from pathlib import Path
 
 # Define paths
 PROJECT_ROOT = Path(__file__).parent.parent
 UPLOAD_DIR = PROJECT_ROOT / "uploads"
 OUTPUT_BASE = PROJECT_ROOT / "outputs"
+CACHE_DIR = PROJECT_ROOT / "cache"
+RESULT_CACHE_DIR = CACHE_DIR / "results"
+INGEST_CACHE_DIR = CACHE_DIR / "ingest"
 
 # Ensure directories exist
 UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_BASE.mkdir(exist_ok=True)
+RESULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+INGEST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 # Configure logging
 logging.basicConfig(
@@ -22,4 +28,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # CORS configuration (can be moved to .env later)
-ALLOWED_ORIGINS = ["*"]
\ No newline at end of file
+ALLOWED_ORIGINS = ["*"]
+
+# Background job execution
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "2"))
+MAX_STORED_JOBS = int(os.getenv("MAX_STORED_JOBS", "100"))
+# Start k-independent comparison rankings while the GA is still running
+COMPARISON_OVERLAP = os.getenv("COMPARISON_OVERLAP", "1") == "1"
+
+# Result cache: identical file + parameters return the stored response
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "500")) * 1024 * 1024
+# Encoded matrices under cache/ingest/, evicted least-recently-used beyond this size
+INGEST_CACHE_MAX_BYTES = int(os.getenv("INGEST_CACHE_MAX_MB", "2000")) * 1024 * 1024
+
+# Uploads and URL downloads are copied to disk in chunks and rejected as soon as they pass the limit
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "50")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Per-job memory budget for the encoded matrix (float32 / row cap beyond it); /run may ask for less, not more
+JOB_MEMORY_MB = int(os.getenv("JOB_MEMORY_MB", "1024"))
+MIN_JOB_MEMORY_MB = 64
+
+# Plots are drawn from a stored chart record: "lazy" on the first GET of /outputs/..., "background" right after the run
+PLOT_RENDERING = os.getenv("PLOT_RENDERING", "lazy")
+
+# Import the scientific stack in a background thread once the app is up (otherwise on first use); /api/ready waits for it
+WARMUP = os.getenv("WARMUP", "1") == "1"
+
+# Per-request cProfile on /run (profile=true); off unless enabled, since it exposes code paths and slows the run
+ALLOW_PROFILING = os.getenv("ALLOW_PROFILING", "0") == "1"
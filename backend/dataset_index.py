@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .config import logger, UPLOAD_DIR
+
+INDEX_FILE = ".datasets.json"
+
+class DatasetIndex:
+    """Sidecar JSON index of uploaded CSVs: rows/columns per file name.
+
+    Entries are valid only while the file's size and mtime match the recorded
+    ones, so a file replaced behind the API's back is re-inspected on the next
+    listing instead of reporting stale counts.
+    """
+
+    def __init__(self, root: Path = UPLOAD_DIR):
+        self.root = Path(root)
+        self.path = self.root / INDEX_FILE
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text())
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        tmp = self.path.with_name(f"{INDEX_FILE}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(self._entries))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write dataset index: {e}")
+
+    def get(self, file: Path, stat: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
+        stat = stat or file.stat()
+        with self._lock:
+            entry = self._load().get(file.name)
+        if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        return entry
+
+    def put(self, file: Path, meta: Dict[str, Any], file_hash: Optional[str] = None) -> Dict[str, Any]:
+        stat = file.stat()
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "rows": meta["rows"],
+            "columns": meta["columns"],
+            "file_hash": file_hash
+        }
+        with self._lock:
+            self._load()[file.name] = entry
+            self._save()
+        return entry
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            if self._load().pop(name, None) is not None:
+                self._save()
+
+    def prune(self, names) -> None:
+        """Drop entries for files that no longer exist."""
+        names = set(names)
+        with self._lock:
+            entries = self._load()
+            stale = [n for n in entries if n not in names]
+            for n in stale:
+                del entries[n]
+            if stale:
+                self._save()
+
+dataset_index = DatasetIndex()
@@ -0,0 +1,160 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import HTTPException
+from .config import logger, MAX_CONCURRENT_JOBS, MAX_STORED_JOBS
+from .metrics import metrics
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+class Job:
+    def __init__(self, job_id: str, description: str = ""):
+        self.id = job_id
+        self.description = description
+        self.status = QUEUED
+        self.stage = QUEUED
+        self.progress: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def is_cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Job {self.id} cancelled")
+
+    def set_stage(self, stage: str, **progress) -> None:
+        with self._lock:
+            self.stage = stage
+            self.progress.update(progress)
+            self.events.append({"type": "stage", "stage": stage, "time": time.time()})
+
+    def update_progress(self, **progress) -> None:
+        with self._lock:
+            self.progress.update(progress)
+
+    def add_event(self, event_type: str, **data) -> None:
+        """Record a progress event for streaming clients (see /jobs/{id}/events)."""
+        with self._lock:
+            self.events.append({"type": event_type, "time": time.time(), **data})
+
+    def events_since(self, index: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.events[index:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self.finished_at or time.time()
+            return {
+                "job_id": self.id,
+                "description": self.description,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed": (now - self.started_at) if self.started_at else 0.0
+            }
+
+class JobManager:
+    """Runs long feature-selection jobs on a bounded thread pool."""
+
+    def __init__(self, max_workers: int = MAX_CONCURRENT_JOBS, max_stored: int = MAX_STORED_JOBS):
+        self.max_stored = max_stored
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, description: str = "", **kwargs) -> Job:
+        """Queue ``fn(job, *args, **kwargs)``; its return value becomes the job result."""
+        job = Job(uuid.uuid4().hex, description)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        logger.info(f"Job {job.id} queued: {description}")
+        return job
+
+    def _run(self, job: Job, fn: Callable, args, kwargs) -> None:
+        job.started_at = time.time()
+        try:
+            # أُلغيت بعد أن بدأ المنفذ تشغيلها (future.cancel فشل): تُنهى كمُلغاة لا تبقى في الانتظار
+            job.raise_if_cancelled()
+            job.status = RUNNING
+            job.result = fn(job, *args, **kwargs)
+            job.status = COMPLETED
+            job.stage = COMPLETED
+        except JobCancelled:
+            job.status = CANCELLED
+            job.stage = CANCELLED
+            logger.info(f"Job {job.id} cancelled")
+        except HTTPException as e:
+            job.status = FAILED
+            job.error = e.detail
+            job.status_code = e.status_code
+            logger.warning(f"Job {job.id} failed: {e.detail}")
+        except Exception as e:
+            job.status = FAILED
+            job.error = "An unexpected error occurred. Please check your data and try again."
+            job.status_code = 500
+            logger.error(f"Job {job.id} crashed: {str(e)}", exc_info=True)
+        finally:
+            job.finished_at = time.time()
+            metrics.inc("fs_jobs_total", status=job.status)
+            metrics.observe("fs_job_duration_seconds", job.finished_at - job.started_at)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_event.set()
+        # مهمة لم تبدأ بعد: تُلغى فورًا
+        if job.future is not None and job.future.cancel():
+            job.status = CANCELLED
+            job.stage = CANCELLED
+            job.finished_at = time.time()
+        return job
+
+    def _evict(self) -> None:
+        finished = [j for j in self._jobs.values() if j.finished]
+        excess = len(self._jobs) - self.max_stored
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(0, excess)]:
+            del self._jobs[job.id]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+job_manager = JobManager()
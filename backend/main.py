@@ -1,8 +1,11 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from pathlib import Path
 from .api import api_router
-from .config import logger, PROJECT_ROOT, ALLOWED_ORIGINS
+from .api.metrics import router as metrics_router
+from .config import logger, PROJECT_ROOT, ALLOWED_ORIGINS, WARMUP
+from .jobs import job_manager
+from .warmup import warmup
+from .plot_renderer import LazyPlotFiles, shutdown as shutdown_plot_renderer
 from fastapi.middleware.cors import CORSMiddleware 
 
 app = FastAPI(
@@ -24,6 +27,11 @@ logger.info(f"CORS enabled for origins: {ALLOWED_ORIGINS}")
 
 # Include API routes
 app.include_router(api_router)
+# Prometheus scrapes /metrics at the root, outside the /api prefix
+app.include_router(metrics_router, tags=["Metrics"])
+
+# Serve outputs folder (mounted before "/" so the frontend mount does not shadow it); plots are rendered on first request
+app.mount("/outputs", LazyPlotFiles(directory=str(PROJECT_ROOT / "outputs"), html=True), name="outputs")
 
 # Serve frontend
 frontend_dir = PROJECT_ROOT / "frontend"
@@ -31,9 +39,16 @@ if not frontend_dir.exists():
     raise RuntimeError(f"Directory '{frontend_dir}' does not exist")
 app.mount("/", StaticFiles(directory=str(frontend_dir), html=True), name="frontend")
 
-# Serve outputs folder
-app.mount("/outputs", StaticFiles(directory=str(PROJECT_ROOT / "outputs"), html=True), name="outputs")
-
 @app.on_event("startup")
 def startup_event():
     logger.info("Application started successfully")
+    if WARMUP:
+        warmup.start()
+    else:
+        warmup.disable()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    job_manager.shutdown()
+    shutdown_plot_renderer()
+    logger.info("Job executor shut down")
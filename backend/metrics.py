@@ -0,0 +1,126 @@
+"""
+Process-wide counters and histograms, exposed in the Prometheus text format.
+
+Jobs, pipeline stages, GA generations, fitness evaluations, comparison
+methods and plot rendering report here; GET /metrics renders everything
+together with process-level gauges (CPU, RSS, threads, open files, uptime).
+"""
+import os
+import resource
+import threading
+import time
+from typing import Dict, Sequence, Tuple
+from utils.timing import LATENCY_BUCKETS, LatencyHistogram
+
+# مدد المراحل والمهام أطول بكثير من تقييم لياقة واحد
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+METRICS = {
+    "fs_jobs_total": ("counter", "Finished feature-selection jobs by status", None),
+    "fs_job_duration_seconds": ("histogram", "Wall time of finished jobs", STAGE_BUCKETS),
+    "fs_stage_duration_seconds": ("histogram", "Wall time per /run pipeline stage", STAGE_BUCKETS),
+    "fs_result_cache_requests_total": ("counter", "Result cache lookups by outcome", None),
+    "fs_ga_generations_total": ("counter", "GA generations run", None),
+    "fs_ga_generation_duration_seconds": ("histogram", "Wall time per GA generation", STAGE_BUCKETS),
+    "fs_fitness_evaluations_total": ("counter", "Fitness evaluations (full fidelity, cache misses)", None),
+    "fs_fitness_evaluation_seconds": ("histogram", "Per-genome fitness evaluation latency", LATENCY_BUCKETS),
+    "fs_comparison_duration_seconds": ("histogram", "Wall time per comparison method", STAGE_BUCKETS),
+    "fs_plot_render_seconds": ("histogram", "Wall time to render the plots of one run", STAGE_BUCKETS)
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+def _number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+class Metrics:
+    """Thread-safe registry of the metrics declared in METRICS."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], LatencyHistogram] = {}
+        self.start_time = time.time()
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def _histogram(self, name: str, labels: Dict[str, str]) -> LatencyHistogram:
+        key = (name, _labels(labels))
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = LatencyHistogram(METRICS[name][2])
+        return hist
+
+    def observe(self, name: str, seconds: float, n: int = 1, **labels) -> None:
+        with self._lock:
+            self._histogram(name, labels).observe(seconds, n)
+
+    def merge(self, name: str, histogram: LatencyHistogram, **labels) -> None:
+        with self._lock:
+            self._histogram(name, labels).merge(histogram)
+
+    def _process_lines(self):
+        from utils.memory import current_rss, peak_rss
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        try:
+            open_fds = len(os.listdir("/proc/self/fd"))
+        except OSError:
+            open_fds = None
+        gauges = [
+            ("process_cpu_seconds_total", "counter", "User and system CPU seconds of this process",
+             usage.ru_utime + usage.ru_stime),
+            ("process_children_cpu_seconds_total", "counter", "CPU seconds of terminated worker processes",
+             children.ru_utime + children.ru_stime),
+            ("process_resident_memory_bytes", "gauge", "Resident set size", current_rss()),
+            ("process_max_resident_memory_bytes", "gauge", "Peak resident set size", peak_rss()),
+            ("process_start_time_seconds", "gauge", "Start time since the epoch", self.start_time),
+            ("process_uptime_seconds", "gauge", "Seconds since start", time.time() - self.start_time),
+            ("process_threads", "gauge", "Live Python threads", threading.active_count()),
+            ("process_open_fds", "gauge", "Open file descriptors", open_fds)
+        ]
+        lines = []
+        for name, kind, help_text, value in gauges:
+            if value is None:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+        return lines
+
+    def render(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: (h.cumulative(), h.count, h.sum) for k, h in self._histograms.items()}
+        lines = []
+        for name, (kind, help_text, _) in METRICS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            if kind == "counter":
+                for (n, labels), value in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+                continue
+            for (n, labels), (buckets, count, total) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for le, c in buckets:
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', _number(le))])} {c}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        lines += self._process_lines()
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
@@ -0,0 +1,94 @@
+"""
+Lazy plot rendering.
+
+A finished run only writes its compact chart record (chart_data.json) to its
+output directory. The PNGs are drawn from that record on the first GET of one
+of the run's /outputs URLs, or right after the run when
+PLOT_RENDERING=background, and then served from disk like any static file.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from .config import logger
+from .metrics import metrics
+
+CHART_DATA_FILE = "chart_data.json"
+RENDERED_MARKER = ".rendered"
+
+# pyplot يعتمد على حالة عامة، لذا يُرسم تشغيل واحد فقط في كل مرة
+_PLOT_LOCK = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plots")
+
+def save_chart_data(out_dir: Path, ds_name: str, parsed: Dict[str, Any]) -> None:
+    """Store the record the plots are drawn from; PNGs of an older run in the same directory are dropped."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with _PLOT_LOCK:
+        (out_dir / RENDERED_MARKER).unlink(missing_ok=True)
+        for png in out_dir.glob("*.png"):
+            png.unlink(missing_ok=True)
+        tmp = out_dir / f"{CHART_DATA_FILE}.tmp"
+        tmp.write_text(json.dumps({"dataset": ds_name, "parsed": parsed}, default=str))
+        os.replace(tmp, out_dir / CHART_DATA_FILE)
+
+def load_chart_data(out_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((out_dir / CHART_DATA_FILE).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def render_plots(out_dir: Path) -> bool:
+    """Draw all PNGs of a run once; False when the directory has no chart record."""
+    with _PLOT_LOCK:
+        if (out_dir / RENDERED_MARKER).exists():
+            return True
+        record = load_chart_data(out_dir)
+        if record is None:
+            return False
+        from utils.plotting import plot_results, plot_comparisons
+        t0 = time.perf_counter()
+        try:
+            logger.info(f"Rendering plots for {out_dir.name}...")
+            plot_results(record["parsed"], out_dir, ds_name=record["dataset"])
+            plot_comparisons(record["parsed"], out_dir, ds_name=record["dataset"])
+        except Exception as e:
+            logger.error(f"Plot generation failed: {str(e)}")
+        metrics.observe("fs_plot_render_seconds", time.perf_counter() - t0)
+        # العلامة تمنع إعادة الرسم عند طلب رسم غير موجود أصلًا (مثل Jaccard بلا طرق مقارنة)
+        (out_dir / RENDERED_MARKER).touch()
+        return True
+
+def schedule_render(out_dir: Path) -> None:
+    _executor.submit(render_plots, out_dir)
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+class LazyPlotFiles(StaticFiles):
+    """StaticFiles for /outputs that renders a run's plots when one of them is first requested."""
+
+    def _run_dir(self, path: str) -> Optional[Path]:
+        root = Path(self.directory).resolve()
+        out_dir = (root / path).parent.resolve()
+        if root not in out_dir.parents or not (out_dir / CHART_DATA_FILE).is_file():
+            return None
+        return out_dir
+
+    async def get_response(self, path: str, scope):
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            out_dir = self._run_dir(path)
+            if out_dir is None or (out_dir / RENDERED_MARKER).exists():
+                raise
+            if not await run_in_threadpool(render_plots, out_dir):
+                raise
+        return await super().get_response(path, scope)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .config import logger, PROJECT_ROOT, RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES
+
+# Bump when the pipeline changes in a way that alters results for the same inputs
+CACHE_VERSION = 6
+
+def _dir_size(path: Path) -> int:
+    if not path.exists():
+        return 0
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+class ResultStore:
+    """Disk-backed store of finished /run responses keyed by file hash + parameters.
+
+    Each entry is ``<key>.json`` holding the response and the output directory
+    that contains its plots; entries are evicted least-recently-used once the
+    combined size of records and plots exceeds ``max_bytes``.
+    """
+
+    def __init__(self, root: Path = RESULT_CACHE_DIR, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(file_hash: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps({"file": file_hash, "params": params, "version": CACHE_VERSION}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        with self._lock:
+            try:
+                entry = json.loads(path.read_text())
+            except (FileNotFoundError, json.JSONDecodeError):
+                return None
+            out_dir = PROJECT_ROOT / entry["out_dir"]
+            if not out_dir.exists():
+                # ملفات الرسوم حُذفت من الخارج: السجل لم يعد صالحًا
+                path.unlink(missing_ok=True)
+                return None
+            os.utime(path)  # آخر استخدام، لإخلاء LRU
+        return entry["response"]
+
+    def put(self, key: str, response: Dict[str, Any], out_dir: Path) -> None:
+        entry = {"response": response, "out_dir": str(Path(out_dir).relative_to(PROJECT_ROOT))}
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        with self._lock:
+            tmp.write_text(json.dumps(entry, default=str))
+            os.replace(tmp, path)
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.root.glob("*.json"):
+            try:
+                out_dir = PROJECT_ROOT / json.loads(path.read_text())["out_dir"]
+            except (OSError, json.JSONDecodeError, KeyError):
+                path.unlink(missing_ok=True)
+                continue
+            size = path.stat().st_size + _dir_size(out_dir)
+            entries.append((path.stat().st_mtime, path, out_dir, size))
+            total += size
+        for _, path, out_dir, size in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            shutil.rmtree(out_dir, ignore_errors=True)
+            total -= size
+            logger.info(f"Evicted cached result {path.stem[:12]} ({size} bytes)")
+
+result_store = ResultStore()
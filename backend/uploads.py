@@ -0,0 +1,70 @@
+import hashlib
+import os
+from pathlib import Path
+import requests
+from fastapi import HTTPException, UploadFile
+from .config import logger, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE
+
+def _partial(dest: Path) -> Path:
+    # نفس المجلد حتى يكون os.replace ذريًا
+    return Path(dest).with_name(Path(dest).name + ".part")
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)}MB")
+
+async def save_upload(file: UploadFile, dest: Path, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    """Copy an upload to ``dest`` chunk by chunk and return its sha256.
+
+    The size limit is checked as data arrives, so an oversized body is rejected
+    without ever being held in memory. Data goes to a ``.part`` file that
+    replaces ``dest`` only once complete, so a rejected upload never touches
+    an existing file of the same name.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    part = _partial(dest)
+    try:
+        with open(part, "wb") as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(part, dest)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    logger.info(f"Saved upload {dest.name}: {size} bytes")
+    return digest.hexdigest()
+
+def download_to_file(url: str, dest: Path, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    """Stream ``url`` into ``dest`` with the same limit as uploads; returns its sha256."""
+    digest = hashlib.sha256()
+    size = 0
+    part = _partial(dest)
+    try:
+        with requests.get(url, timeout=30, stream=True) as resp:
+            resp.raise_for_status()
+            with open(part, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise _too_large(max_bytes)
+                    digest.update(chunk)
+                    f.write(chunk)
+        os.replace(part, dest)
+    except requests.exceptions.Timeout:
+        part.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="URL request timed out")
+    except requests.exceptions.RequestException as e:
+        part.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=f"Failed to download from URL: {str(e)}")
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    logger.info(f"Downloaded {url}: {size} bytes")
+    return digest.hexdigest()
@@ -0,0 +1,76 @@
+"""
+Background warm-up of the scientific stack.
+
+The API modules import pandas / sklearn / matplotlib and the GA modules only
+inside the functions that use them, so the app starts (and /api/health
+answers) without paying for them. Once the app is up, a daemon thread imports
+them ahead of the first run; /api/ready reports 503 until that is done.
+With WARMUP=0 nothing is imported ahead of time and the app is ready at once.
+"""
+import importlib
+import threading
+import time
+from typing import Any, Dict, Optional
+from .config import logger
+
+# بترتيب الاعتماد: المكتبات أولًا ثم وحدات المشروع التي تستخدمها
+HEAVY_MODULES = [
+    "numpy",
+    "scipy.sparse",
+    "pandas",
+    "sklearn.linear_model",
+    "sklearn.model_selection",
+    "matplotlib.pyplot",
+    "seaborn",
+    "utils.data",
+    "utils.comparison",
+    "utils.ga_optimized",
+    "utils.ga_original",
+    "utils.ga_islands",
+    "utils.plotting"
+]
+
+class Warmup:
+    """Imports HEAVY_MODULES once in a daemon thread and records how long each took."""
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self.error: Optional[str] = None
+        self.seconds: Dict[str, float] = {}
+        self.disabled = False
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def disable(self) -> None:
+        """No background imports (WARMUP=0): modules load on first use, so there is nothing to wait for."""
+        self.disabled = True
+        self.ready.set()
+
+    def _run(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            for name in HEAVY_MODULES:
+                t = time.perf_counter()
+                importlib.import_module(name)
+                self.seconds[name] = time.perf_counter() - t
+            logger.info(f"Warm-up finished in {time.perf_counter() - t0:.2f}s")
+        except Exception as e:
+            # الوحدات تُستورد عند أول استخدام على أي حال؛ الخطأ يظهر في /ready فقط
+            self.error = f"{name}: {e}"
+            logger.error(f"Warm-up failed: {self.error}")
+        finally:
+            self.ready.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready.is_set() and self.error is None,
+            "error": self.error,
+            "warmup": "disabled" if self.disabled else "enabled",
+            "warmup_seconds": {k: round(v, 4) for k, v in self.seconds.items()}
+        }
+
+warmup = Warmup()
@@ -0,0 +1,60 @@
+"""
+Import-time budget for the API server.
+
+Imports backend.main in fresh interpreters and fails (exit code 1) when the
+best of --repeat runs exceeds --budget seconds, or when the import pulls in
+any module of the scientific stack, which must only load on first use or in
+the background warm-up (backend/warmup.py). tests/test_import_time.py runs
+the same check under pytest.
+
+    python -m benchmarks.import_time --budget 0.6
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BUDGET_SECONDS = 0.6
+
+# لا يجوز أن تُستورد أي منها عند بدء الخادم
+HEAVY_PREFIXES = ("numpy", "pandas", "scipy", "sklearn", "matplotlib", "seaborn", "joblib",
+                  "utils.data", "utils.comparison", "utils.ga_", "utils.plotting")
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - t0
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+def measure() -> dict:
+    # WARMUP=0: الاستيراد وحده، بدون خيط التسخين (لا يبدأ إلا مع startup على أي حال)
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+                         env={**os.environ, "WARMUP": "0"})
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check the import time of backend.main against a budget")
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS, help="seconds")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    runs = [measure() for _ in range(args.repeat)]
+    best = min(r["seconds"] for r in runs)
+    heavy = sorted({m for r in runs for m in r["modules"] if m.startswith(HEAVY_PREFIXES)})
+    print(f"backend.main import: best {best:.3f}s over {args.repeat} runs (budget {args.budget:.3f}s)")
+    failures = []
+    if best > args.budget:
+        failures.append(f"import time {best:.3f}s exceeds budget {args.budget:.3f}s")
+    if heavy:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy[:10])}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
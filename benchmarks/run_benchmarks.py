@@ -0,0 +1,240 @@
+"""
+Benchmark harness for the GA implementations.
+
+Generates synthetic regression / classification datasets with
+sklearn.datasets.make_*, runs every GA variant on each with fixed seeds and
+records wall time, fitness evaluations per second, peak RSS and the final
+cross-validated score of the selected features. Each case runs in a fresh
+process so peak memory is per case.
+
+    python -m benchmarks.run_benchmarks --suite quick
+    python -m benchmarks.run_benchmarks --suite full --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+
+Results are written as JSON and CSV under benchmarks/results/. The run fails
+(exit code 1) when an optimized variant is slower than ga_original on the same
+dataset by more than --min-speedup allows, or when a case regresses against
+the baseline by more than --max-slowdown (wall time) or --score-tolerance.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+SEED = 42
+
+# (rows, features, informative features)
+SUITES = {
+    "quick": [(500, 20, 5), (2000, 50, 10)],
+    "full": [(1000, 50, 10), (5000, 100, 15), (20000, 200, 20)]
+}
+
+GA_PARAMS = {"pop_size": 30, "generations": 10, "cv": 3, "mutation_rate": 0.02, "crossover_rate": 0.8}
+
+# اسم المتغير => (الوحدة، معاملات إضافية)؛ closed_form للانحدار الخطي فقط
+VARIANTS = {
+    "original": ("ga_original", {}),
+    "optimized_sklearn": ("ga_optimized", {"evaluator": "sklearn"}),
+    "optimized_closed_form": ("ga_optimized", {"evaluator": "closed_form"}),
+    "optimized_surrogate": ("ga_optimized", {"evaluator": "sklearn", "surrogate": "ridge"}),
+    "islands": ("ga_islands", {"evaluator": "sklearn", "n_islands": 2, "migration_interval": 3})
+}
+
+def make_dataset(task: str, rows: int, features: int, informative: int):
+    import pandas as pd
+    from sklearn.datasets import make_classification, make_regression
+    if task == "regression":
+        X, y = make_regression(n_samples=rows, n_features=features, n_informative=informative,
+                               noise=10.0, random_state=SEED)
+    else:
+        X, y = make_classification(n_samples=rows, n_features=features, n_informative=informative,
+                                   n_redundant=min(informative, features - informative), random_state=SEED)
+    columns = [f"f{i}" for i in range(features)]
+    return pd.DataFrame(X, columns=columns), pd.Series(y, name="target")
+
+def model_factory(task: str):
+    from sklearn.linear_model import LinearRegression, LogisticRegression
+    if task == "regression":
+        return LinearRegression
+    return lambda: LogisticRegression(max_iter=1000, random_state=SEED)
+
+def run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one (dataset, variant) pair; executed in a fresh process."""
+    sys.path.insert(0, str(PROJECT_ROOT))
+    from sklearn.model_selection import cross_val_score
+    from utils.ga_islands import run_island_ga
+    from utils.ga_optimized import run_ga as run_ga_optimized
+    from utils.ga_original import run_ga as run_ga_original
+
+    runners = {"ga_original": run_ga_original, "ga_optimized": run_ga_optimized, "ga_islands": run_island_ga}
+    module, extra = VARIANTS[case["variant"]]
+    X, y = make_dataset(case["task"], case["rows"], case["features"], case["informative"])
+    factory = model_factory(case["task"])
+    scoring = "neg_mean_squared_error" if case["task"] == "regression" else "accuracy"
+    kwargs = dict(GA_PARAMS, seed=SEED, scoring=scoring, patience=GA_PARAMS["generations"])
+    if module != "ga_original":
+        kwargs.update(extra, n_jobs=case["n_jobs"])
+
+    t0 = time.perf_counter()
+    best_genome, best_fitness, history, stats = runners[module](X, y, factory, **kwargs)
+    wall = time.perf_counter() - t0
+
+    # نفس مقياس التقييم لكل المتغيرات: CV كامل على الميزات المختارة
+    selected = [c for bit, c in zip(best_genome, X.columns) if bit]
+    scores = cross_val_score(factory(), X[selected], y, cv=GA_PARAMS["cv"], scoring=scoring)
+    final_score = float(-scores.mean()) if case["task"] == "regression" else float(scores.mean())
+
+    evaluations = int(stats.get("evaluations", 0))
+    return {
+        **case,
+        "wall_time_s": wall,
+        "evaluations": evaluations,
+        "evaluations_per_s": evaluations / wall if wall > 0 else None,
+        "generations_run": len(history),
+        "best_fitness": float(best_fitness),
+        "n_selected": len(selected),
+        "final_score": final_score,
+        "score_metric": "mse" if case["task"] == "regression" else "accuracy",
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "evaluator": stats.get("evaluator", "sklearn")
+    }
+
+def build_cases(suite: str, variants: List[str], tasks: List[str], n_jobs: int) -> List[Dict[str, Any]]:
+    cases = []
+    for rows, features, informative in SUITES[suite]:
+        for task in tasks:
+            for variant in variants:
+                if variant == "optimized_closed_form" and task != "regression":
+                    continue
+                cases.append({
+                    "id": f"{task}-{rows}x{features}-{variant}",
+                    "dataset": f"{task}-{rows}x{features}",
+                    "task": task,
+                    "rows": rows,
+                    "features": features,
+                    "informative": informative,
+                    "variant": variant,
+                    "n_jobs": n_jobs
+                })
+    return cases
+
+def check_speedup(results: List[Dict[str, Any]], min_speedup: float) -> List[str]:
+    """Optimized variants must be at least ``min_speedup`` times faster than ga_original on the same dataset."""
+    failures = []
+    original = {r["dataset"]: r for r in results if r["variant"] == "original"}
+    for r in results:
+        base = original.get(r["dataset"])
+        if base is None or r["variant"] == "original":
+            continue
+        speedup = base["wall_time_s"] / r["wall_time_s"]
+        r["speedup_vs_original"] = speedup
+        if speedup < min_speedup:
+            failures.append(f"{r['id']}: speedup {speedup:.2f}x < {min_speedup:.2f}x vs original")
+    return failures
+
+def check_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any], max_slowdown: float,
+                   score_tolerance: float) -> List[str]:
+    failures = []
+    previous = {r["id"]: r for r in baseline.get("results", [])}
+    for r in results:
+        old = previous.get(r["id"])
+        if old is None:
+            continue
+        if r["wall_time_s"] > old["wall_time_s"] * max_slowdown:
+            failures.append(f"{r['id']}: wall time {r['wall_time_s']:.2f}s > {max_slowdown:.2f} x baseline {old['wall_time_s']:.2f}s")
+        # MSE: الأصغر أفضل؛ accuracy: الأكبر أفضل
+        if r["score_metric"] == "mse":
+            worse = r["final_score"] > old["final_score"] * (1 + score_tolerance)
+        else:
+            worse = r["final_score"] < old["final_score"] * (1 - score_tolerance)
+        if worse:
+            failures.append(f"{r['id']}: {r['score_metric']} {r['final_score']:.4f} regressed from baseline {old['final_score']:.4f}")
+    return failures
+
+def environment() -> Dict[str, Any]:
+    import numpy as np
+    import pandas as pd
+    import sklearn
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__
+    }
+
+def write_results(results: List[Dict[str, Any]], report: Dict[str, Any], out_dir: Path) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    json_path = out_dir / f"bench-{stamp}.json"
+    json_path.write_text(json.dumps(report, indent=2))
+    fields = sorted({k for r in results for k in r})
+    with open(out_dir / f"bench-{stamp}.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(results)
+    return json_path
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark GA variants on synthetic datasets")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--variants", nargs="+", choices=sorted(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--tasks", nargs="+", choices=["regression", "classification"], default=["regression", "classification"])
+    parser.add_argument("--n-jobs", type=int, default=-1, help="n_jobs for the optimized / island variants")
+    parser.add_argument("--out-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--baseline", type=Path, help="JSON report to compare against")
+    parser.add_argument("--save-baseline", type=Path, help="also write this run's report to this path")
+    parser.add_argument("--min-speedup", type=float, default=0.75,
+                        help="minimum wall-time ratio original / variant; <1 tolerates a slower variant on few cores")
+    parser.add_argument("--max-slowdown", type=float, default=1.25)
+    parser.add_argument("--score-tolerance", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.suite, args.variants, args.tasks, args.n_jobs)
+    results = []
+    for case in cases:
+        # عملية جديدة لكل حالة حتى تكون ذروة الذاكرة خاصة بها
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            result = executor.submit(run_case, case).result()
+        results.append(result)
+        print(f"{result['id']:<45} {result['wall_time_s']:8.2f}s {result['evaluations_per_s'] or 0:8.1f} eval/s "
+              f"{result['peak_rss_mb']:7.1f}MB {result['score_metric']}={result['final_score']:.4f}", flush=True)
+
+    failures = check_speedup(results, args.min_speedup)
+    if args.baseline:
+        failures += check_baseline(results, json.loads(args.baseline.read_text()), args.max_slowdown,
+                                   args.score_tolerance)
+    report = {
+        "suite": args.suite,
+        "ga_params": GA_PARAMS,
+        "seed": SEED,
+        "environment": environment(),
+        "thresholds": {"min_speedup": args.min_speedup, "max_slowdown": args.max_slowdown,
+                       "score_tolerance": args.score_tolerance},
+        "results": results,
+        "failures": failures
+    }
+    path = write_results(results, report, args.out_dir)
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {path}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,43 @@ document.querySelectorAll('.tab-btn').forEach(button => {
 });
 
 // Form submission (يُستخدم في upload.html)
+function finishedStatus(status) {
+  return ['completed', 'failed', 'cancelled'].includes(status);
+}
+
+// Fallback when EventSource is unavailable or the stream drops
+async function pollJob(job) {
+  let status = job;
+  while (!finishedStatus(status.status)) {
+    await new Promise(resolve => setTimeout(resolve, 1000));
+    const res = await fetch(job.status_url);
+    if (!res.ok) throw new Error('Lost track of the running job');
+    status = await res.json();
+  }
+  return status;
+}
+
+// Streams per-generation progress over Server-Sent Events
+function streamJob(job, onGeneration, onStage) {
+  return new Promise((resolve, reject) => {
+    if (!window.EventSource) {
+      pollJob(job).then(resolve, reject);
+      return;
+    }
+    const source = new EventSource(`/api/jobs/${job.job_id}/events`);
+    source.addEventListener('stage', e => onStage(JSON.parse(e.data)));
+    source.addEventListener('generation', e => onGeneration(JSON.parse(e.data)));
+    source.addEventListener('end', e => {
+      source.close();
+      resolve(JSON.parse(e.data));
+    });
+    source.onerror = () => {
+      source.close();
+      pollJob(job).then(resolve, reject);
+    };
+  });
+}
+
 document.getElementById('uploadForm')?.addEventListener('submit', async (e) => {
   e.preventDefault();
   const formData = new FormData(e.target);
@@ -20,6 +57,8 @@ document.getElementById('uploadForm')?.addEventListener('submit', async (e) => {
   submitBtn.textContent = 'Processing...';
 
   const progress = document.getElementById('progress');
+  const progressFill = document.querySelector('.progress-fill');
+  const progressText = document.getElementById('progressText');
   if (progress) progress.style.display = 'block';
 
   try {
@@ -31,7 +70,25 @@ document.getElementById('uploadForm')?.addEventListener('submit', async (e) => {
       const err = await res.json();
       throw new Error(err.detail || 'Unknown error');
     }
-    const data = await res.json();
+    const job = await res.json();
+    const status = await streamJob(job,
+      (gen) => {
+        const pct = Math.min(100, 100 * gen.generation / gen.total_generations);
+        if (progressFill) progressFill.style.width = pct + '%';
+        if (progressText) {
+          progressText.textContent = `Generation ${gen.generation}/${gen.total_generations} · ` +
+            `best ${gen.best_score.toFixed(4)} · ${gen.n_features} features · ` +
+            `${gen.evaluations} evaluations (${gen.cache_hits} cached) · ${gen.elapsed.toFixed(1)}s`;
+        }
+      },
+      (stage) => {
+        submitBtn.textContent = `Processing... (${stage.stage})`;
+      }
+    );
+    if (status.status === 'cancelled') throw new Error('Job was cancelled');
+    const resultRes = await fetch(job.result_url);
+    const data = await resultRes.json();
+    if (!resultRes.ok) throw new Error(data.detail || 'Unknown error');
     localStorage.setItem('lastResult', JSON.stringify(data));
     window.location.href = 'results.html';
   } catch (err) {
@@ -0,0 +1,47 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import make_regression
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.feature_selection import RFE
+from sklearn.linear_model import LinearRegression
+from utils.comparison import ComparisonScheduler, RankingCancelled, rank_features
+
+def _data(n_features=30):
+    X, y = make_regression(200, n_features, n_informative=8, noise=5.0, random_state=0)
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(n_features)]), y
+
+def test_interruptible_rankings_match_sklearn():
+    X, y = _data()
+    rfe = RFE(LinearRegression(), n_features_to_select=1).fit(X.values, y)
+    assert rank_features("RFE", X, X.values, y) == list(X.columns[np.argsort(rfe.ranking_, kind="mergesort")])
+    rf = RandomForestRegressor(n_estimators=100, random_state=42).fit(X.values, y)
+    expected = list(pd.Series(rf.feature_importances_, index=X.columns).sort_values(ascending=False).index)
+    assert rank_features("RandomForest_topK", X, X.values, y) == expected
+
+@pytest.mark.parametrize("method", ["RFE", "RandomForest_topK"])
+def test_ranking_stops_between_steps(method):
+    X, y = _data()
+    calls = []
+    # يُطلب الإيقاف بعد أول فحص: يجب أن تتوقف الطريقة عند الخطوة التالية
+    with pytest.raises(RankingCancelled):
+        rank_features(method, X, X.values, y, should_stop=lambda: calls.append(1) or len(calls) > 2)
+    assert len(calls) == 3
+
+def test_close_stops_and_waits_for_rankings():
+    X, y = _data(n_features=300)
+    started = threading.Event()
+
+    def should_stop():
+        started.set()
+        return False
+
+    scheduler = ComparisonScheduler(X, y, LinearRegression, cv=3, methods=["RFE"], n_jobs=1)
+    scheduler.start_rankings(should_stop=should_stop)
+    assert started.wait(5)
+    scheduler.close()
+    future = scheduler._rankings["RFE"]
+    assert future.done()
+    assert isinstance(future.exception(), RankingCancelled)
+    assert scheduler.run(5)["RFE"]["error"] == "cancelled"
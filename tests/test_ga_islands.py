@@ -0,0 +1,21 @@
+import time
+import pytest
+from sklearn.datasets import make_regression
+from sklearn.linear_model import LinearRegression
+from utils.ga_islands import run_island_ga
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_stop_request_ends_epoch_early(n_jobs):
+    X, y = make_regression(n_samples=200, n_features=20, noise=1.0, random_state=0)
+    generations = 200
+    deadline = time.perf_counter() + 0.3
+
+    # حقبة واحدة تغطي كل الأجيال: الإيقاف لا يصل إلا إذا فُحص داخل الجزر كل جيل
+    best, fitness, history, stats = run_island_ga(
+        X, y, LinearRegression, pop_size=40, generations=generations, cv=3, seed=0, patience=generations,
+        evaluator="sklearn", n_jobs=n_jobs, n_islands=2, migration_interval=generations,
+        should_stop=lambda: time.perf_counter() > deadline
+    )
+    assert 0 < len(history) < generations
+    assert len(best) == X.shape[1]
+    assert stats["migrations"] == 0
@@ -0,0 +1,45 @@
+import os
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+import backend.api.data_management
+import backend.main
+from backend.dataset_index import DatasetIndex
+from utils.data import file_sha256, ingest_dataset
+
+def _csv(path, seed):
+    rng = np.random.RandomState(seed)
+    pd.DataFrame({"a": rng.randn(200), "b": rng.randn(200), "target": rng.randn(200)}).to_csv(path, index=False)
+    return path
+
+def test_ingest_cache_evicts_least_recently_used(tmp_path):
+    cache = tmp_path / "ingest"
+    first, second, third = (_csv(tmp_path / f"d{i}.csv", i) for i in range(3))
+    ingest_dataset(first, cache, 10, False, target="target")
+    entry_size = sum(p.stat().st_size for p in cache.rglob("*") if p.is_file() and p.name != "raw.json")
+    ingest_dataset(second, cache, 10, False, target="target")
+    # d0 أقدم كتابة لكن آخر استخدام => d1 هو الأقل استخدامًا حديثًا
+    os.utime(next((cache / file_sha256(second)).iterdir()), (0, 0))
+    assert ingest_dataset(first, cache, 10, False, target="target")[2]["cache_hit"]
+    ingest_dataset(third, cache, 10, False, target="target", max_cache_bytes=int(2.5 * entry_size))
+
+    hits = {p.name: ingest_dataset(p, cache, 10, False, target="target")[2]["cache_hit"] for p in (first, third)}
+    assert hits == {"d0.csv": True, "d2.csv": True}
+    assert [p.name for p in (cache / file_sha256(second)).iterdir()] == ["raw.json"]
+
+def test_delete_purges_ingest_cache_unless_content_shared(tmp_path, monkeypatch):
+    uploads, cache = tmp_path / "uploads", tmp_path / "ingest"
+    uploads.mkdir()
+    monkeypatch.setattr(backend.api.data_management, "UPLOAD_DIR", uploads)
+    monkeypatch.setattr(backend.api.data_management, "INGEST_CACHE_DIR", cache)
+    monkeypatch.setattr(backend.api.data_management, "dataset_index", DatasetIndex(uploads))
+    _csv(uploads / "a.csv", 0)
+    (uploads / "copy.csv").write_bytes((uploads / "a.csv").read_bytes())
+    file_hash = file_sha256(uploads / "a.csv")
+    ingest_dataset(uploads / "a.csv", cache, 10, False, target="target")
+
+    client = TestClient(backend.main.app)
+    assert client.delete("/api/dataset/a.csv").status_code == 200
+    assert (cache / file_hash).exists()
+    assert client.delete("/api/dataset/copy.csv").status_code == 200
+    assert not (cache / file_hash).exists()
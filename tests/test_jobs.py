@@ -0,0 +1,21 @@
+from backend.jobs import CANCELLED, COMPLETED, QUEUED, JobManager
+
+def test_cancel_after_worker_picked_up_job():
+    manager = JobManager(max_workers=1)
+    calls = []
+    job = manager.submit(lambda job: calls.append(job.id) or {"ok": True})
+    job.future.result()
+    assert job.status == COMPLETED
+
+    # الإلغاء يصل بعد أن بدأ المنفذ _run وقبل استدعاء الدالة
+    late = manager.submit(lambda job: None)
+    late.future.result()
+    late.status, late.finished_at = QUEUED, None
+    late.cancel_event.set()
+    manager._run(late, lambda job: calls.append(job.id), (), {})
+    assert late.status == CANCELLED
+    assert late.stage == CANCELLED
+    assert late.finished
+    assert late.finished_at is not None
+    assert late.id not in calls
+    manager.shutdown()
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import KFold, cross_val_score
+from utils.linear_engine import IncrementalLinearEngine, LinearCVEngine
+
+CV = 3
+
+def _one_hot_frame(seed=0, n=400):
+    # one-hot كامل: أعمدة كل فئة مجموعها 1 = عمود الحد الثابت => مصفوفة منفردة الرتبة
+    rng = np.random.RandomState(seed)
+    cats = pd.DataFrame({f"c{i}": rng.choice(list("abc"), n) for i in range(4)})
+    num = pd.DataFrame(rng.randn(n, 4) * [1, 10, 100, 1000] + [0, 50, 5000, 1e5], columns=[f"n{i}" for i in range(4)])
+    X = pd.concat([num, pd.get_dummies(cats).astype(float)], axis=1)
+    y = num.values @ [1.0, 0.1, 0.01, 0.001] + (cats == "a").values.sum(axis=1) + rng.randn(n)
+    return X, y, rng
+
+def _duplicated_frame(seed=0):
+    X, y, rng = _one_hot_frame(seed)
+    X["dup"] = X["n2"]
+    X["combo"] = 3 * X["n1"] - X["n3"]
+    return X, y, rng
+
+def _cv_mse(X, y, genome):
+    return -cross_val_score(LinearRegression(), X[:, genome.astype(bool)], y, cv=CV,
+                            scoring="neg_mean_squared_error").mean()
+
+def _min_norm_mse(X, y, genome):
+    """Per-fold minimum-norm least squares: LinearRegression without LAPACK noise in the null space."""
+    Xs = X[:, genome.astype(bool)]
+    total = 0.0
+    for tr, te in KFold(CV).split(Xs):
+        x_mean, y_mean = Xs[tr].mean(axis=0), y[tr].mean()
+        beta = np.linalg.lstsq(Xs[tr] - x_mean, y[tr] - y_mean, rcond=1e-9)[0]
+        total += np.mean((y[te] - y_mean - (Xs[te] - x_mean) @ beta) ** 2)
+    return total / CV
+
+def _unpenalised(engine, genomes):
+    return engine.evaluate(genomes) - engine.lambda_penalty * genomes.sum(axis=1) / engine.n_features
+
+@pytest.mark.parametrize("make_frame, seed", [(_one_hot_frame, 4), (_duplicated_frame, 0)])
+def test_rank_deficient_matches_cross_val_score(make_frame, seed):
+    X, y, rng = make_frame(seed)
+    X = X.values
+    genomes = rng.randint(0, 2, (80, X.shape[1])).astype(np.uint8)
+    genomes[0] = 1
+    ours = _unpenalised(LinearCVEngine(X, y, cv=CV), genomes)
+
+    compared = 0
+    for genome, value in zip(genomes, ours):
+        assert value == pytest.approx(_min_norm_mse(X, y, genome), rel=1e-8)
+        # على اتجاهات الصفر يبقي lstsq في sklearn قيمًا منفردة بحجم الضجيج فتتغير نتيجته مع ترتيب
+        # الأعمدة؛ المقارنة المباشرة فقط حيث تكون نتيجته محددة
+        sk = _cv_mse(X, y, genome)
+        if sk == pytest.approx(_cv_mse(X[:, ::-1], y, genome[::-1]), rel=1e-9):
+            assert value == pytest.approx(sk, rel=1e-7)
+            compared += 1
+    assert compared >= len(genomes) // 2
+
+def test_rank_deficient_incremental_matches_full_solve():
+    X, y, rng = _duplicated_frame(seed=1)
+    X = X.values
+    engine = IncrementalLinearEngine(X, y, cv=CV, min_features=4)
+    parents = (rng.rand(30, X.shape[1]) < 0.6).astype(np.uint8)
+    engine.evaluate(parents)
+    for _ in range(4):
+        # أبناء على بعد بتين من أب سابق => مسار التحديث التدريجي
+        children = parents[rng.randint(0, len(parents), 60)].copy()
+        rows = np.arange(len(children))
+        for _ in range(2):
+            children[rows, rng.randint(0, X.shape[1], len(children))] ^= 1
+        ours = _unpenalised(engine, children)
+        expected = [_min_norm_mse(X, y, g) for g in children]
+        np.testing.assert_allclose(ours, expected, rtol=1e-8)
+        parents = children[:30]
+    assert engine.stats()["incremental"] > 0
+
+def test_incremental_counts_fallbacks():
+    X, y, _ = _duplicated_frame(seed=2)
+    columns = list(X.columns)
+    X = X.values
+    engine = IncrementalLinearEngine(X, y, cv=CV, min_features=3)
+
+    def genome(*names):
+        g = np.zeros(X.shape[1], dtype=np.uint8)
+        g[[columns.index(n) for n in names]] = 1
+        return g
+
+    parent = genome("n0", "n1", "n2", "n3")
+    engine.evaluate(parent[None, :])
+    children = np.array([
+        genome("n0", "n1", "n2", "n3", "c0_a"),  # تحديث رتبة واحدة عادي
+        genome("n0", "n1", "n2", "n3", "dup"),   # عمود مكرر => مكمّل Schur صفري => fallback
+        genome("n0", "n1")                       # أقل من min_features
+    ])
+    ours = _unpenalised(engine, children)
+    np.testing.assert_allclose(ours, [_min_norm_mse(X, y, g) for g in children], rtol=1e-8)
+    assert engine.stats() == {"incremental": 1, "full": 1, "fallback": 1, "small": 1}
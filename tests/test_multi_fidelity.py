@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from utils.ga_optimized import run_ga
+
+class FullCVFails(LinearRegression):
+    """Fits on the low-fidelity split (375 rows) but not on the full CV folds."""
+
+    def fit(self, X, y, sample_weight=None):
+        if len(y) > 400:
+            raise ValueError("too many rows")
+        return super().fit(X, y, sample_weight)
+
+def test_low_fidelity_scores_never_become_best():
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame(rng.randn(900, 6), columns=[f"f{i}" for i in range(6)])
+    y = pd.Series(X.values @ rng.randn(6) + rng.randn(900))
+    # لا قيمة كاملة محدودة في أي جيل => لا يجوز أن يُعاد جينوم بلياقة الفحص
+    with pytest.raises(ValueError, match="finite fitness"):
+        run_ga(X, y, FullCVFails, pop_size=8, generations=3, cv=3, seed=0, evaluator="sklearn",
+               use_parallel=False, multi_fidelity=True, patience=10)
@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+import backend.main
+import backend.api.health
+from backend.warmup import Warmup
+
+def _client(monkeypatch, enabled):
+    # حالة إحماء جديدة لكل اختبار بدل الكائن المشترك على مستوى الوحدة
+    state = Warmup()
+    monkeypatch.setattr(backend.main, "WARMUP", enabled)
+    monkeypatch.setattr(backend.main, "warmup", state)
+    monkeypatch.setattr(backend.api.health, "warmup", state)
+    monkeypatch.setattr(state, "start", lambda: None)
+    return TestClient(backend.main.app)
+
+def test_ready_without_warmup(monkeypatch):
+    with _client(monkeypatch, enabled=False) as client:
+        response = client.get("/api/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["warmup"] == "disabled"
+
+def test_warming_until_warmup_finishes(monkeypatch):
+    with _client(monkeypatch, enabled=True) as client:
+        assert client.get("/api/ready").status_code == 503
+        backend.api.health.warmup.ready.set()
+        response = client.get("/api/ready")
+    assert response.status_code == 200
+    assert response.json()["warmup"] == "enabled"
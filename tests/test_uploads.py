@@ -0,0 +1,30 @@
+import asyncio
+import io
+import pytest
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+import backend.api.data_management
+import backend.main
+from backend.uploads import save_upload
+
+ORIGINAL = b"a,b\n1,2\n3,4\n"
+
+def test_rejected_upload_keeps_existing_file(tmp_path):
+    dest = tmp_path / "keep.csv"
+    dest.write_bytes(ORIGINAL)
+    upload = UploadFile(io.BytesIO(b"a,b\n" + b"5,6\n" * 100), filename="keep.csv")
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(save_upload(upload, dest, max_bytes=64))
+    assert exc.value.status_code == 400
+    assert dest.read_bytes() == ORIGINAL
+    assert list(tmp_path.iterdir()) == [dest]
+
+def test_invalid_reupload_keeps_existing_dataset(tmp_path, monkeypatch):
+    dest = tmp_path / "keep.csv"
+    dest.write_bytes(ORIGINAL)
+    monkeypatch.setattr(backend.api.data_management, "UPLOAD_DIR", tmp_path)
+    client = TestClient(backend.main.app)
+    response = client.post("/api/upload", files={"file": ("keep.csv", b"a,b\n", "text/csv")})
+    assert response.status_code == 400
+    assert dest.read_bytes() == ORIGINAL
+    assert list(tmp_path.iterdir()) == [dest]
@@ -0,0 +1,49 @@
+"""
+Chart data for a finished run, independent of matplotlib.
+
+chart_series() turns the compact result record of a run into the series the
+PNG plots are drawn from, so the same numbers can be served as JSON and drawn
+client-side.
+"""
+from typing import Any, Dict
+
+# ترتيب ثابت للطرق في الرسوم وفي JSON
+METHOD_ORDER = ['SelectKBest', 'VarianceThreshold', 'MutualInfo_topK', 'LassoCV', 'RandomForest_topK', 'RFE']
+
+def jaccard(a, b):
+    A = set(a)
+    B = set(b)
+    if not A and not B:
+        return 1.0
+    return len(A & B) / len(A | B)
+
+def chart_series(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-generation history and per-method score / count / time / overlap with GA."""
+    is_classification = parsed.get('is_classification', False)
+    comps = parsed.get('comparisons', {})
+    ga_sel = parsed.get('selected', [])
+    methods = [{
+        "method": "GA",
+        "score": parsed.get('best_mse'),
+        "n_selected": len(ga_sel),
+        "time_s": parsed.get('ga_time', 0.0),
+        "jaccard_with_ga": None
+    }]
+    for name in METHOD_ORDER:
+        if name in comps:
+            v = comps[name]
+            selected = v.get('selected', []) or []
+            methods.append({
+                "method": name,
+                "score": v.get('cv_mse'),
+                "n_selected": len(selected),
+                "time_s": v.get('time_s', 0.0),
+                "jaccard_with_ga": jaccard(ga_sel, selected)
+            })
+    history = parsed.get('gen_mse') or []
+    return {
+        "metric": "accuracy" if is_classification else "mse",
+        "higher_is_better": is_classification,
+        "generations": {"generation": list(range(1, len(history) + 1)), "best": history},
+        "methods": methods
+    }
@@ -1,10 +1,107 @@
 import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+from joblib import effective_n_jobs
 from sklearn.linear_model import Ridge, LinearRegression, LassoCV, LogisticRegression
 from sklearn.neural_network import MLPRegressor, MLPClassifier
-from sklearn.feature_selection import SelectKBest, f_regression, f_classif, VarianceThreshold, RFE, mutual_info_regression, mutual_info_classif
+from sklearn.feature_selection import f_regression, f_classif, RFE, mutual_info_regression, mutual_info_classif
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.model_selection import cross_val_score
+from .data import is_sparse_frame, sparse_values
+
+logger = logging.getLogger(__name__)
+
+# طرق لا يعتمد ترتيبها للميزات على k، فيمكن حسابها أثناء تشغيل GA
+# (RFE: يُحسب ranking_ الكامل مرة واحدة ثم يُقطع عند أي k)
+K_INDEPENDENT_METHODS = ("SelectKBest", "LassoCV", "RFE", "VarianceThreshold", "MutualInfo_topK", "RandomForest_topK")
+
+# عدد الأعمدة التي تُحوَّل إلى كثيفة في كل دفعة لـ mutual_info على مصفوفة متناثرة
+MI_BLOCK_COLUMNS = 256
+# الغابة العشوائية تُبنى على دفعات من الأشجار (warm_start، نفس النتيجة) ليُفحص الإيقاف بينها
+RF_TREES = 100
+RF_TREES_PER_STEP = 25
+
+class RankingCancelled(Exception):
+    """Raised inside a ranking when its ``should_stop`` callback turns true."""
+
+def dataset_fingerprint(X, y) -> str:
+    """Content hash of the feature frame (values and column names) and target."""
+    h = hashlib.sha256()
+    h.update("\x1f".join(map(str, X.columns)).encode("utf-8"))
+    if is_sparse_frame(X):
+        M = sparse_values(X)
+        M.sum_duplicates()
+        for part in (M.indptr, M.indices, M.data):
+            h.update(np.ascontiguousarray(part).tobytes())
+    else:
+        h.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    h.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).values.tobytes())
+    return h.hexdigest()
+
+def impute_features(X):
+    """Mean-impute numeric NaNs; returns X itself (no copy) when nothing is missing.
+
+    Sparse frames are already imputed by prepare_dataframe() and come back as
+    a CSC matrix, the layout sklearn's sparse selectors and models expect.
+    """
+    if is_sparse_frame(X):
+        return sparse_values(X).tocsc()
+    if not X.isna().values.any():
+        return X
+    return X.fillna(X.mean(numeric_only=True))
+
+def feature_subset(X, sel: List[str]):
+    """``X[sel]``, as a CSR matrix when X is a sparse frame."""
+    return sparse_values(X[sel]) if is_sparse_frame(X) else X[sel]
+
+def _sparse_variance(M) -> np.ndarray:
+    # نفس تباين pandas (ddof=1) دون تحويل المصفوفة إلى كثيفة
+    n = M.shape[0]
+    mean = np.asarray(M.mean(axis=0)).ravel()
+    sq_mean = np.asarray(M.multiply(M).mean(axis=0)).ravel()
+    return (sq_mean - mean ** 2) * n / max(n - 1, 1)
+
+def _blockwise_mutual_info(mi_func, M, y, seed: int) -> np.ndarray:
+    """mutual_info_* on a sparse matrix, densifying MI_BLOCK_COLUMNS columns at a time.
+
+    Each feature's MI is computed independently, so blocks keep the continuous
+    estimator that a sparse input would otherwise switch off.
+    """
+    M = M.tocsc()
+    return np.concatenate([
+        mi_func(M[:, start:start + MI_BLOCK_COLUMNS].toarray(), y, random_state=seed)
+        for start in range(0, M.shape[1], MI_BLOCK_COLUMNS)
+    ])
+
+class RankingCache:
+    """Thread-safe LRU of feature rankings keyed by (dataset hash, method, seed, task)."""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[List[str]]:
+        with self._lock:
+            ranking = self._data.get(key)
+            if ranking is not None:
+                self._data.move_to_end(key)
+            return ranking
+
+    def put(self, key: Tuple, ranking: List[str]) -> None:
+        with self._lock:
+            self._data[key] = ranking
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+ranking_cache = RankingCache()
 
 def get_model_factory(model_type: str, is_classification: bool = False):
     if is_classification:
@@ -22,57 +119,241 @@ def get_model_factory(model_type: str, is_classification: bool = False):
         else:
             return lambda: LinearRegression()
 
-def run_comparison_method(method_name: str, X, y, k: int, model_factory, cv: int, is_classification: bool = False, seed: int = 42):
-    t0 = time.perf_counter()
-    try:
-        X_filled = X.fillna(X.mean(numeric_only=True))
-
-        if method_name == "SelectKBest":
-            score_func = f_classif if is_classification else f_regression
-            skb = SelectKBest(score_func, k=min(k, X.shape[1]))
-            skb.fit(X_filled, y)
-            sel = list(X.columns[skb.get_support()])
-        elif method_name == "LassoCV":
-            if is_classification:
-                from sklearn.linear_model import LogisticRegressionCV
-                lasso = LogisticRegressionCV(cv=5, random_state=seed, max_iter=5000, penalty='l1', solver='liblinear')
-                lasso.fit(X_filled, y)
-                coefs = lasso.coef_[0] if lasso.coef_.ndim > 1 else lasso.coef_
-                sel = [c for c, coef in zip(X.columns, coefs) if abs(coef) > 1e-6]
-            else:
-                lasso = LassoCV(cv=5, random_state=seed, max_iter=5000).fit(X_filled, y)
-                sel = [c for c, coef in zip(X.columns, lasso.coef_) if abs(coef) > 1e-6]
-        elif method_name == "RFE":
-            estimator = LogisticRegression(max_iter=1000, random_state=seed) if is_classification else LinearRegression()
-            rfe = RFE(estimator, n_features_to_select=min(k, X.shape[1]))
-            rfe.fit(X_filled, y)
-            sel = list(X.columns[rfe.get_support()])
-        elif method_name == "VarianceThreshold":
+def _check_stop(should_stop: Optional[Callable[[], bool]]) -> None:
+    if should_stop is not None and should_stop():
+        raise RankingCancelled("Ranking stopped")
+
+def _coef_checking_stop(should_stop: Optional[Callable[[], bool]]) -> Callable:
+    # importance_getter يُستدعى بعد كل ملاءمة في حلقة الحذف لـ RFE: نقطة إيقاف بين الخطوات
+    def getter(estimator):
+        _check_stop(should_stop)
+        return estimator.coef_
+    return getter
+
+def rank_features(method_name: str, X, X_filled, y, is_classification: bool = False, seed: int = 42,
+                  n_jobs: Optional[int] = None, should_stop: Optional[Callable[[], bool]] = None) -> List[str]:
+    """Columns ordered best-first by a k-independent method (LassoCV: its selected set).
+
+    ``should_stop`` is polled between RFE eliminations and random-forest tree
+    batches; RankingCancelled is raised once it returns True.
+    """
+    _check_stop(should_stop)
+    if method_name == "SelectKBest":
+        score_func = f_classif if is_classification else f_regression
+        scores = np.asarray(score_func(X_filled, y)[0], dtype=float)
+        scores[np.isnan(scores)] = np.finfo(float).min
+        # نفس ترتيب SelectKBest عند التعادل (argsort مستقر، الأخير أولاً)
+        return list(X.columns[np.argsort(scores, kind="mergesort")[::-1]])
+    elif method_name == "LassoCV":
+        if is_classification:
+            from sklearn.linear_model import LogisticRegressionCV
+            lasso = LogisticRegressionCV(cv=5, random_state=seed, max_iter=5000, penalty='l1', solver='liblinear', n_jobs=n_jobs)
+            lasso.fit(X_filled, y)
+            coefs = lasso.coef_[0] if lasso.coef_.ndim > 1 else lasso.coef_
+            return [c for c, coef in zip(X.columns, coefs) if abs(coef) > 1e-6]
+        lasso = LassoCV(cv=5, random_state=seed, max_iter=5000, n_jobs=n_jobs).fit(X_filled, y)
+        return [c for c, coef in zip(X.columns, lasso.coef_) if abs(coef) > 1e-6]
+    elif method_name == "RFE":
+        estimator = LogisticRegression(max_iter=1000, random_state=seed) if is_classification else LinearRegression()
+        rfe = RFE(estimator, n_features_to_select=1, importance_getter=_coef_checking_stop(should_stop)).fit(X_filled, y)
+        return list(X.columns[np.argsort(rfe.ranking_, kind="mergesort")])
+    elif method_name == "VarianceThreshold":
+        if is_sparse_frame(X):
+            var = pd.Series(_sparse_variance(X_filled), index=X.columns)
+        else:
             var = X.var(numeric_only=True)
-            sel = list(var.nlargest(k).index)
-        elif method_name == "MutualInfo_topK":
-            mi_func = mutual_info_classif if is_classification else mutual_info_regression
-            mi = mi_func(X_filled, y, random_state=seed)
-            mi_rank = pd.Series(mi, index=X.columns).sort_values(ascending=False)
-            sel = list(mi_rank.index[:k])
-        elif method_name == "RandomForest_topK":
-            estimator = RandomForestClassifier(n_estimators=100, random_state=seed) if is_classification else RandomForestRegressor(n_estimators=100, random_state=seed)
-            rf = estimator.fit(X_filled, y)
-            imp = pd.Series(rf.feature_importances_, index=X.columns).sort_values(ascending=False)
-            sel = list(imp.index[:k])
+        return list(var.nlargest(len(var)).index)
+    elif method_name == "MutualInfo_topK":
+        mi_func = mutual_info_classif if is_classification else mutual_info_regression
+        if is_sparse_frame(X):
+            mi = _blockwise_mutual_info(mi_func, X_filled, y, seed)
         else:
-            sel = []
+            mi = mi_func(X_filled, y, random_state=seed)
+        return list(pd.Series(mi, index=X.columns).sort_values(ascending=False).index)
+    elif method_name == "RandomForest_topK":
+        forest = RandomForestClassifier if is_classification else RandomForestRegressor
+        rf = forest(n_estimators=RF_TREES_PER_STEP, random_state=seed, n_jobs=n_jobs, warm_start=True)
+        for n_trees in range(RF_TREES_PER_STEP, RF_TREES + 1, RF_TREES_PER_STEP):
+            _check_stop(should_stop)
+            rf.set_params(n_estimators=n_trees).fit(X_filled, y)
+        return list(pd.Series(rf.feature_importances_, index=X.columns).sort_values(ascending=False).index)
+    raise ValueError(f"Method {method_name} has no k-independent ranking")
+
+def select_from_ranking(method_name: str, ranking: List[str], k: int, columns) -> List[str]:
+    if method_name == "LassoCV":
+        return list(ranking)
+    top = ranking[:k]
+    if method_name in ("SelectKBest", "RFE"):
+        # get_support يعيد الأعمدة بترتيبها الأصلي
+        top_set = set(top)
+        return [c for c in columns if c in top_set]
+    return list(top)
+
+def cached_ranking(method_name: str, X, X_filled, y, is_classification: bool = False, seed: int = 42,
+                   n_jobs: Optional[int] = None, fingerprint: Optional[str] = None,
+                   cache: Optional[RankingCache] = ranking_cache,
+                   should_stop: Optional[Callable[[], bool]] = None) -> List[str]:
+    """rank_features() memoized per (dataset hash, method, seed, task).
 
-        scoring = 'accuracy' if is_classification else 'neg_mean_squared_error'
-        metric = None
-        if sel:
-            scores = cross_val_score(model_factory(), X[sel], y, cv=cv, scoring=scoring, n_jobs=-1)
-            metric = float(scores.mean())
-            if not is_classification:
-                metric = -metric  # convert to positive MSE
+    ``X_filled`` may be a zero-argument callable so imputation only happens on a miss.
+    """
+    key = None
+    if cache is not None:
+        key = (fingerprint or dataset_fingerprint(X, y), method_name, seed, is_classification)
+        ranking = cache.get(key)
+        if ranking is not None:
+            return ranking
+    if callable(X_filled):
+        X_filled = X_filled()
+    ranking = rank_features(method_name, X, X_filled, y, is_classification, seed, n_jobs, should_stop)
+    if key is not None:
+        cache.put(key, ranking)
+    return ranking
 
+def select_features(method_name: str, X, X_filled, y, k: int, is_classification: bool = False, seed: int = 42,
+                    n_jobs: Optional[int] = None, fingerprint: Optional[str] = None) -> List[str]:
+    if method_name not in K_INDEPENDENT_METHODS:
+        return []
+    ranking = cached_ranking(method_name, X, X_filled, y, is_classification, seed, n_jobs, fingerprint)
+    return select_from_ranking(method_name, ranking, k, X.columns)
+
+def score_selection(sel: List[str], X, y, model_factory, cv: int, is_classification: bool = False, n_jobs: int = -1) -> Optional[float]:
+    if not sel:
+        return None
+    scoring = 'accuracy' if is_classification else 'neg_mean_squared_error'
+    scores = cross_val_score(model_factory(), feature_subset(X, sel), y, cv=cv, scoring=scoring, n_jobs=n_jobs)
+    metric = float(scores.mean())
+    if not is_classification:
+        metric = -metric  # convert to positive MSE
+    return metric
+
+def run_comparison_method(method_name: str, X, y, k: int, model_factory, cv: int, is_classification: bool = False, seed: int = 42):
+    t0 = time.perf_counter()
+    try:
+        sel = select_features(method_name, X, lambda: impute_features(X), y, k, is_classification, seed)
+        metric = score_selection(sel, X, y, model_factory, cv, is_classification)
         t1 = time.perf_counter()
         return {"selected": sel, "mse": metric, "time": t1 - t0}
     except Exception as e:
         t1 = time.perf_counter()
-        return {"selected": [], "mse": None, "time": t1 - t0}
\ No newline at end of file
+        return {"selected": [], "mse": None, "time": t1 - t0}
+
+class ComparisonScheduler:
+    """Runs comparison methods concurrently within a shared core budget.
+
+    ``start_rankings`` launches the k-independent ranking work in the
+    background (typically while the GA is running, on ``prefetch_workers``
+    single-threaded workers); ``run(k)`` then cuts each ranking at k and
+    cross-validates every selection in parallel. Rankings are memoized in
+    ``ranking_cache`` and all methods share one lazily imputed matrix. A
+    ranking stops at its next step once the ``should_stop`` given to
+    start_rankings()/run() returns True or close() is called, and close()
+    waits for the ranking threads to exit.
+    """
+
+    def __init__(self, X, y, model_factory, cv: int, is_classification: bool = False, seed: int = 42,
+                 methods: Optional[List[str]] = None, n_jobs: int = -1, prefetch_workers: Optional[int] = None,
+                 profile_dir: Optional[str] = None):
+        self.X = X
+        self.y = y
+        self.model_factory = model_factory
+        self.cv = cv
+        self.is_classification = is_classification
+        self.seed = seed
+        self.methods = list(methods) if methods is not None else []
+        self.core_budget = effective_n_jobs(n_jobs)
+        self.concurrency = max(1, min(len(self.methods), self.core_budget))
+        # نصيب كل طريقة من الأنوية عند التشغيل المتزامن
+        self.jobs_per_method = max(1, self.core_budget // self.concurrency)
+        self.prefetch_workers = prefetch_workers or max(1, self.core_budget // 4)
+        self.fingerprint = dataset_fingerprint(X, y)
+        self._X_filled = None
+        self._fill_lock = threading.Lock()
+        self._prefetch_executor = None
+        self._rankings: Dict[str, object] = {}
+        self._ranking_time: Dict[str, float] = {}
+        self._should_stop: Optional[Callable[[], bool]] = None
+        self._closed = threading.Event()
+        # profile_dir: كل خيط مقارنة يكتب ملف cProfile خاصًا به (انظر utils/profiling.py)
+        self.profile_dir = profile_dir
+
+    @property
+    def X_filled(self):
+        with self._fill_lock:
+            if self._X_filled is None:
+                self._X_filled = impute_features(self.X)
+            return self._X_filled
+
+    def _stopped(self) -> bool:
+        return self._closed.is_set() or (self._should_stop is not None and self._should_stop())
+
+    def _rank(self, method: str, n_jobs: int) -> List[str]:
+        t0 = time.perf_counter()
+        try:
+            return cached_ranking(method, self.X, lambda: self.X_filled, self.y, self.is_classification,
+                                  self.seed, n_jobs, self.fingerprint, should_stop=self._stopped)
+        finally:
+            self._ranking_time[method] = time.perf_counter() - t0
+
+    def start_rankings(self, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        """Begin k-independent ranking work in the background."""
+        if self._prefetch_executor is not None:
+            return
+        self._should_stop = should_stop
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=self.prefetch_workers, thread_name_prefix="rank")
+        for method in self.methods:
+            if method in K_INDEPENDENT_METHODS:
+                self._rankings[method] = self._prefetch_executor.submit(self._call, f"rank-{method}", self._rank, method, 1)
+
+    def _call(self, name: str, fn: Callable, *args):
+        if self.profile_dir is None:
+            return fn(*args)
+        from .profiling import profiled
+        with profiled(self.profile_dir, name):
+            return fn(*args)
+
+    def _run_method(self, method: str, k: int, should_stop: Optional[Callable[[], bool]]) -> dict:
+        if should_stop is not None and should_stop():
+            return {"selected": [], "mse": None, "time": 0.0, "error": "cancelled"}
+        t0 = time.perf_counter()
+        try:
+            if method in self._rankings:
+                ranking = self._rankings[method].result()
+                sel = select_from_ranking(method, ranking, k, self.X.columns)
+            elif method in K_INDEPENDENT_METHODS:
+                ranking = self._rank(method, self.jobs_per_method)
+                sel = select_from_ranking(method, ranking, k, self.X.columns)
+            else:
+                sel = []
+            metric = score_selection(sel, self.X, self.y, self.model_factory, self.cv, self.is_classification, self.jobs_per_method)
+            # الوقت = الترتيب (حتى لو حُسب مسبقًا) + الاختيار والتقييم
+            elapsed = time.perf_counter() - t0
+            if method in self._rankings:
+                elapsed += self._ranking_time.get(method, 0.0)
+            return {"selected": sel, "mse": metric, "time": elapsed}
+        except RankingCancelled:
+            return {"selected": [], "mse": None, "time": time.perf_counter() - t0, "error": "cancelled"}
+        except Exception as e:
+            logger.warning(f"Comparison method {method} failed: {e}")
+            return {"selected": [], "mse": None, "time": time.perf_counter() - t0}
+
+    def run(self, k: int, should_stop: Optional[Callable[[], bool]] = None,
+            on_result: Optional[Callable[[str, dict], None]] = None) -> Dict[str, dict]:
+        results = {}
+        if should_stop is not None:
+            self._should_stop = should_stop
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="compare") as executor:
+            futures = {executor.submit(self._call, f"compare-{m}", self._run_method, m, k, should_stop): m
+                       for m in self.methods}
+            for fut in as_completed(futures):
+                method = futures[fut]
+                results[method] = fut.result()
+                if on_result is not None:
+                    on_result(method, results[method])
+        return {m: results[m] for m in self.methods}
+
+    def close(self) -> None:
+        """Stop unfinished rankings and wait for their threads, so nothing keeps running after the job ends."""
+        self._closed.set()
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=True, cancel_futures=True)
@@ -1,54 +1,266 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+import logging
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from pathlib import Path
+from typing import List, Optional, Tuple
+from .memory import budget_rows, plan_memory
+from .preprocessing import TabularPreprocessor
+from .timing import StageTimer
 
-def prepare_data_for_example(path: str, group_top: int, drop_numeric_features: bool, target: str = None, drop_cols=None, max_cardinality: int = None):
+logger = logging.getLogger(__name__)
+
+# Bump when preprocessing changes so stale encoded matrices are not reused
+INGEST_VERSION = 1
+
+def file_sha256(path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def is_sparse_frame(X) -> bool:
+    """True for a DataFrame whose columns are all pandas SparseDtype (see TabularPreprocessor(sparse=True))."""
+    return isinstance(X, pd.DataFrame) and X.shape[1] > 0 and all(isinstance(t, pd.SparseDtype) for t in X.dtypes)
+
+def sparse_values(X) -> sp.csr_matrix:
+    """CSR matrix of a sparse frame's values (column order preserved)."""
+    return X.sparse.to_coo().tocsr()
+
+def prepare_data_for_example(path: str, group_top: int, drop_numeric_features: bool, target: str = None, drop_cols=None, max_cardinality: int = None, sparse: Optional[bool] = False):
     df = pd.read_csv(path)
-    if drop_cols:
-        to_drop = [c for c in drop_cols if c in df.columns]
-        if to_drop:
-            df = df.drop(columns=to_drop)
-    cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    df_proc = df.copy()
-    if max_cardinality is not None:
-        cat_card = {c: df_proc[c].nunique(dropna=True) for c in df_proc.columns if df_proc[c].dtype == 'object' or str(df_proc[c].dtype).startswith('category')}
-        drop_high = [c for c, card in cat_card.items() if card > max_cardinality]
-        if drop_high:
-            df_proc = df_proc.drop(columns=drop_high)
-    if group_top and group_top > 0:
-        for c in cat_cols:
-            top = df_proc[c].value_counts().nlargest(group_top).index
-            df_proc[c] = df_proc[c].where(df_proc[c].isin(top), other='OTHER')
-    if cat_cols:
-        df_enc = pd.get_dummies(df_proc, columns=cat_cols, dummy_na=False)
+    return prepare_dataframe(df, group_top, drop_numeric_features, target, drop_cols, max_cardinality, sparse)
+
+def prepare_dataframe(df: pd.DataFrame, group_top: int, drop_numeric_features: bool, target: str = None, drop_cols=None, max_cardinality: int = None, sparse: Optional[bool] = False):
+    """Encode, impute and split ``df`` into (X, y) with a freshly fitted TabularPreprocessor."""
+    pre = TabularPreprocessor(group_top, drop_numeric_features, target, drop_cols, max_cardinality, sparse)
+    return pre.fit_transform(df)
+
+def raw_metadata(df: pd.DataFrame) -> dict:
+    """Shape, column names and dtypes of a parsed (not yet encoded) CSV."""
+    return {
+        "rows": int(len(df)),
+        "columns": int(df.shape[1]),
+        "column_names": [str(c) for c in df.columns],
+        "dtypes": {str(c): str(t) for c, t in df.dtypes.items()}
+    }
+
+def _merge_dtype(a: np.dtype, b: np.dtype) -> np.dtype:
+    # نفس ترقية الأنواع التي يقوم بها read_csv عند قراءة الملف كاملًا
+    if a == b:
+        return a
+    if a.kind in "iuf" and b.kind in "iuf":
+        return np.result_type(a, b)
+    return np.dtype(object)
+
+def inspect_csv(path, chunksize: int = 50_000, sample_rows: int = 5) -> dict:
+    """raw_metadata() plus a sample, computed with a chunked reader.
+
+    Memory stays bounded by ``chunksize`` rows whatever the file size.
+    """
+    rows = 0
+    columns = None
+    dtypes = {}
+    sample = []
+    with pd.read_csv(path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            if columns is None:
+                columns = [str(c) for c in chunk.columns]
+                dtypes = dict(zip(columns, chunk.dtypes))
+                head = chunk.head(sample_rows)
+                sample = head.astype(object).where(head.notna(), None).to_dict(orient='records')
+            else:
+                for c, t in zip(columns, chunk.dtypes):
+                    dtypes[c] = _merge_dtype(dtypes[c], t)
+            rows += len(chunk)
+    if columns is None:
+        # ملف فيه ترويسة فقط: القارئ المجزأ لا يعيد أي جزء
+        header = pd.read_csv(path, nrows=0)
+        columns = [str(c) for c in header.columns]
+        dtypes = dict(zip(columns, header.dtypes))
+    return {
+        "rows": rows,
+        "columns": len(columns),
+        "column_names": columns,
+        "dtypes": {c: str(t) for c, t in dtypes.items()},
+        "sample": sample
+    }
+
+def load_raw_metadata(cache_dir, file_hash: str) -> Optional[dict]:
+    try:
+        return json.loads((Path(cache_dir) / file_hash / "raw.json").read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def save_raw_metadata(cache_dir, file_hash: str, meta: dict) -> None:
+    entry = Path(cache_dir) / file_hash
+    entry.mkdir(parents=True, exist_ok=True)
+    tmp = entry / f"raw.json.{uuid.uuid4().hex}"
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, entry / "raw.json")
+
+def _entry_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+def evict_ingest_cache(cache_dir, max_bytes: int, keep: Optional[Path] = None) -> None:
+    """Delete least-recently-used encoded matrices until the cache fits in ``max_bytes``.
+
+    Entries are the ``<file hash>/<options key>/`` directories, ordered by the
+    mtime that every cache hit refreshes; the per-file raw.json is kept.
+    """
+    entries = []
+    total = 0
+    for path in Path(cache_dir).glob("*/*"):
+        # كتابة جارية (.tmp-) أو raw.json: ليست مدخلات قابلة للإخلاء
+        if not path.is_dir() or ".tmp-" in path.name:
+            continue
+        try:
+            size = _entry_size(path)
+            entries.append((path.stat().st_mtime, path, size))
+        except FileNotFoundError:
+            continue
+        total += size
+    for _, path, size in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        if keep is not None and path == keep:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        logger.info(f"Evicted ingest cache entry {path.parent.name[:12]}/{path.name} ({size} bytes)")
+
+def purge_ingest_cache(cache_dir, file_hash: str) -> None:
+    """Remove every cached encoding and the raw metadata of one file content."""
+    shutil.rmtree(Path(cache_dir) / file_hash, ignore_errors=True)
+
+def _options_key(options: dict) -> str:
+    payload = json.dumps({**options, "version": INGEST_VERSION}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+def _apply_memory_plan(values, y: np.ndarray, columns: List[str], target, is_sparse: bool, plan: dict):
+    """Row cap + dtype from plan_memory(), then the frame; ``values`` may be a read-only memmap."""
+    rows = budget_rows(len(y), plan["max_rows"])
+    dtype = np.dtype(plan["dtype"])
+    if isinstance(values, np.memmap) and rows is None and values.dtype == dtype:
+        # memmap بلا تغيير في النوع أو الصفوف: نسخة واحدة إلى الذاكرة
+        values = np.array(values)
     else:
-        df_enc = df_proc.copy()
-    numeric = df_enc.select_dtypes(include=['number'])
-    numeric_cols = numeric.columns.tolist()
-    if target is not None:
-        if target not in df_enc.columns:
-            raise RuntimeError(f"Target column '{target}' not found in CSV after encoding")
-        target_col = target
+        if rows is not None:
+            values = values[rows]
+            y = y[rows]
+        # من memmap تُقرأ الصفوف المختارة فقط، ويُحوَّل النوع دون بقاء نسخة float64 كاملة
+        values = values.astype(dtype, copy=False)
+    if is_sparse:
+        X = pd.DataFrame.sparse.from_spmatrix(values, columns=columns)
     else:
-        if not numeric_cols:
-            raise RuntimeError('No numeric columns found to use as target')
-        target_col = numeric_cols[-1]
-    if drop_numeric_features:
-        numeric_feature_cols = [c for c in numeric.columns if c != target_col]
-        df_enc = df_enc.drop(columns=numeric_feature_cols)
-    y = df_enc[target_col]
-    X = df_enc.drop(columns=[target_col])
-    
-    # Handle missing values BEFORE dropping
-    numeric_X = X.select_dtypes(include=['number'])
-    X_filled = X.copy()
-    for col in numeric_X.columns:
-        if X_filled[col].isna().any():
-            X_filled[col].fillna(X_filled[col].mean(), inplace=True)
-    if y.isna().any():
-        y.fillna(y.median(), inplace=True)
-    
-    # Now align X and y without dropping rows
-    valid = X_filled.join(y).dropna()
-    X_final = valid.drop(columns=[target_col])
-    y_final = valid[target_col]
-    return X_final, y_final
\ No newline at end of file
+        X = pd.DataFrame(np.asarray(values), columns=columns)
+    return X, pd.Series(y, name=target)
+
+def ingest_dataset(
+    path,
+    cache_dir,
+    group_top: int,
+    drop_numeric_features: bool,
+    target: str = None,
+    drop_cols=None,
+    max_cardinality: int = None,
+    file_hash: Optional[str] = None,
+    sparse: Optional[bool] = None,
+    memory_budget: Optional[int] = None,
+    max_cache_bytes: Optional[int] = None
+) -> Tuple[pd.DataFrame, pd.Series, dict]:
+    """prepare_data_for_example() backed by an on-disk cache of the encoded matrix.
+
+    The first call for a given file content + options parses and encodes the
+    CSV once and stores X as a float64 .npy (or a CSR .npz when the encoding
+    is sparse) plus y, the fitted TabularPreprocessor (preprocessor.json, to
+    encode new data the same way) and a JSON sidecar under
+    ``cache_dir/<file hash>/<options key>/``; later calls only load the arrays.
+    ``memory_budget`` (bytes) applies plan_memory(): the returned X may be
+    float32 and row-capped, while the cache always keeps the full float64
+    matrix; dense cache hits are memory-mapped so the float64 copy is never
+    resident. With ``max_cache_bytes`` the cache is kept under that size by
+    evict_ingest_cache() after each write; hits refresh the entry's mtime.
+    Returns ``(X, y, info)`` where info holds the raw CSV metadata,
+    whether the cache was hit, whether X is sparse, the memory plan, seconds
+    per ingest stage (``load`` on a hit; ``parse``, ``prep``, ``cache_write``
+    otherwise) and the per-stage preprocessing timings (None on a cache hit).
+    """
+    timer = StageTimer()
+    file_hash = file_hash or file_sha256(path)
+    options = {
+        "group_top": group_top,
+        "drop_numeric_features": drop_numeric_features,
+        "target": target,
+        "drop_cols": sorted(drop_cols) if drop_cols else None,
+        "max_cardinality": max_cardinality,
+        "sparse": sparse
+    }
+    entry = Path(cache_dir) / file_hash / _options_key(options)
+    meta_path = entry / "meta.json"
+    if meta_path.exists():
+        try:
+            with timer.stage("load"):
+                meta = json.loads(meta_path.read_text())
+                is_sparse = bool(meta.get("sparse"))
+                values = sp.load_npz(entry / "X.npz") if is_sparse else np.load(entry / "X.npy", mmap_mode='r')
+                y_values = np.load(entry / "y.npy")
+                plan = plan_memory(len(y_values), len(meta["columns"]), memory_budget,
+                                   nnz=values.nnz if is_sparse else None)
+                X, y = _apply_memory_plan(values, y_values, meta["columns"], meta["target"], is_sparse, plan)
+            os.utime(entry)  # آخر استخدام، لإخلاء LRU
+            return X, y, {"raw": meta["raw"], "cache_hit": True, "file_hash": file_hash,
+                          "sparse": is_sparse, "memory": {**plan, "encoded_rows": len(y_values)},
+                          "timings": timer.timings, "prep_timings": None}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable ingest cache entry {entry}: {e}")
+
+    with timer.stage("parse"):
+        df = pd.read_csv(path)
+        raw = raw_metadata(df)
+    if load_raw_metadata(cache_dir, file_hash) is None:
+        save_raw_metadata(cache_dir, file_hash, raw)
+    with timer.stage("prep"):
+        pre = TabularPreprocessor(group_top, drop_numeric_features, target, drop_cols, max_cardinality, sparse)
+        X, y = pre.fit_transform(df)
+        del df
+        is_sparse = is_sparse_frame(X)
+        columns = [str(c) for c in X.columns]
+        values = sparse_values(X) if is_sparse else X.to_numpy(dtype=np.float64)
+        del X
+        y_values = y.to_numpy()
+
+    # كتابة ذرّية: مجلد مؤقت ثم إعادة تسمية، حتى لا تقرأ مهمة أخرى مدخلًا ناقصًا
+    tmp = entry.with_name(f"{entry.name}.tmp-{uuid.uuid4().hex}")
+    t0 = time.perf_counter()
+    try:
+        tmp.mkdir(parents=True)
+        if is_sparse:
+            sp.save_npz(tmp / "X.npz", values)
+        else:
+            np.save(tmp / "X.npy", values, allow_pickle=False)
+        np.save(tmp / "y.npy", y_values, allow_pickle=False)
+        pre.save(tmp / "preprocessor.json")
+        meta = {"columns": columns, "target": y.name, "raw": raw, "options": options,
+                "sparse": is_sparse}
+        (tmp / "meta.json").write_text(json.dumps(meta, default=str))
+        os.rename(tmp, entry)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not cache encoded dataset: {e}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if max_cache_bytes is not None:
+            evict_ingest_cache(cache_dir, max_cache_bytes, keep=entry)
+        timer.add("cache_write", time.perf_counter() - t0)
+    plan = plan_memory(len(y_values), len(columns), memory_budget, nnz=values.nnz if is_sparse else None)
+    X, y = _apply_memory_plan(values, y_values, columns, y.name, is_sparse, plan)
+    return X, y, {"raw": raw, "cache_hit": False, "file_hash": file_hash, "sparse": is_sparse,
+                  "memory": {**plan, "encoded_rows": len(y_values)}, "timings": timer.timings,
+                  "prep_timings": pre.timings}
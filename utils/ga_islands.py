@@ -0,0 +1,331 @@
+"""
+Island-model Genetic Algorithm.
+
+The population is split into ``n_islands`` sub-populations that evolve
+independently in worker processes and exchange their best genomes every
+``migration_interval`` generations along a ring, fully connected or random
+topology. The generations between two migrations form one epoch: every island
+is one task per epoch and carries its population, fitness values and RNG state
+from one epoch to the next. Workers memory-map the feature matrix once and keep
+a fitness cache per island. A stop request (should_stop) reaches the islands
+through a flag file and is checked every generation, not just per epoch.
+"""
+import os
+import shutil
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_EXCEPTION, wait
+from typing import List, Tuple, Callable, Optional, Dict, Any
+import logging
+import numpy as np
+import pandas as pd
+from joblib import effective_n_jobs
+from joblib.externals.loky import ProcessPoolExecutor
+from .ga_optimized import (
+    CROSSOVER_METHODS, FitnessCache, _take_rows, breed, evaluate_with_cache, feature_matrix, fitness,
+    generate_population, make_evaluation_plan, plan_summary
+)
+from .linear_engine import build_linear_engine
+from .timing import LatencyHistogram, timed_batches
+from .worker_pool import load_shared, share_array
+logger = logging.getLogger(__name__)
+
+TOPOLOGIES = ("ring", "fully_connected", "random")
+
+# حالة كل عملية عاملة: البيانات والمقيّم وذاكرة لياقة لكل جزيرة
+_WORKER_STATE = {}
+# العملية الأم تفحص should_stop بهذه الفترة أثناء انتظار الجزر
+STOP_POLL_SECONDS = 0.2
+STOP_FILE = "stop"
+
+def _resolve_evaluator(X, y, model_factory, cv, scoring, max_samples, lambda_penalty, evaluator):
+    engine = None
+    if evaluator in ("auto", "closed_form"):
+        engine = build_linear_engine(X, y, model_factory, cv, scoring, max_samples, lambda_penalty)
+        if engine is None and evaluator == "closed_form":
+            raise ValueError("Closed-form evaluator supports only LinearRegression/Ridge with MSE scoring")
+    elif evaluator != "sklearn":
+        raise ValueError(f"Unknown evaluator: {evaluator}")
+    return engine
+
+def _setup_state(state, X, y, model_factory, cv, scoring, max_samples, lambda_penalty, evaluator, cache_size, engine=None):
+    if engine is None and evaluator == "closed_form":
+        engine = _resolve_evaluator(X, y, model_factory, cv, scoring, max_samples, lambda_penalty, evaluator)
+    if engine is not None:
+        evaluate_batch = engine.evaluate
+    else:
+        def evaluate_batch(genomes):
+            return [fitness(g, X, y, model_factory, cv, scoring, max_samples, lambda_penalty) for g in genomes]
+    state.update(evaluate_batch=evaluate_batch, caches={}, cache_size=cache_size)
+
+def _init_island_worker(x_path, y, model_factory, cv, scoring, max_samples, lambda_penalty, evaluator, cache_size,
+                        profile_dir=None, stop_path=None):
+    X = load_shared(x_path)
+    _setup_state(_WORKER_STATE, X, y, model_factory, cv, scoring, max_samples, lambda_penalty, evaluator, cache_size)
+    _WORKER_STATE["profile_dir"] = profile_dir
+    if stop_path is not None:
+        _WORKER_STATE["should_stop"] = lambda: os.path.exists(stop_path)
+
+def _evolve(state, island: int, population, fitnesses, rng_state, n_generations: int,
+            crossover_rate: float, mutation_rate: float, crossover: str) -> Dict[str, Any]:
+    """Run one epoch of an island; the first epoch starts by scoring the initial population.
+
+    The epoch ends early when ``state["should_stop"]()`` turns true, so the
+    returned history may be shorter than ``n_generations``.
+    """
+    rng = np.random.RandomState()
+    rng.set_state(rng_state)
+    cache = state["caches"].setdefault(island, FitnessCache(state["cache_size"]))
+    hits, misses = cache.hits, cache.misses
+    latency = LatencyHistogram()
+    evaluate_batch = timed_batches(state["evaluate_batch"], latency)
+    history = []
+    should_stop = state.get("should_stop")
+    for _ in range(n_generations):
+        if fitnesses is not None and should_stop is not None and should_stop():
+            break
+        if fitnesses is not None:
+            elite = population[np.argmin(fitnesses)]
+            offspring = breed(population, fitnesses, len(population) - 1, crossover_rate, mutation_rate, crossover, rng)
+            population = np.concatenate([elite[None, :], offspring])
+        fitnesses = np.asarray(evaluate_with_cache(population, cache, evaluate_batch))
+        history.append(float(fitnesses.min()))
+    return {
+        "island": island,
+        "population": population,
+        "fitnesses": fitnesses,
+        "rng_state": rng.get_state(),
+        "history": history,
+        "evaluations": cache.misses - misses,
+        "cache_hits": cache.hits - hits,
+        "cache_size": len(cache),
+        "fitness_latency": latency
+    }
+
+def _evolve_in_worker(*args) -> Dict[str, Any]:
+    if _WORKER_STATE["profile_dir"] is not None:
+        from .profiling import worker_profiled
+        return worker_profiled(_WORKER_STATE["profile_dir"], _evolve, _WORKER_STATE, *args)
+    return _evolve(_WORKER_STATE, *args)
+
+def _gather(futures, should_stop: Optional[Callable[[], bool]], stop_path: str) -> List[Dict[str, Any]]:
+    """Wait for one epoch of every island, raising the stop flag for the workers once should_stop() is true."""
+    pending = set(futures)
+    while pending:
+        _, pending = wait(pending, timeout=STOP_POLL_SECONDS, return_when=FIRST_EXCEPTION)
+        if should_stop is not None and not os.path.exists(stop_path) and should_stop():
+            open(stop_path, "w").close()
+    return [f.result() for f in futures]
+
+def _routes(n_islands: int, topology: str, rng) -> List[Tuple[int, int]]:
+    if topology == "ring":
+        return [(i, (i + 1) % n_islands) for i in range(n_islands)]
+    if topology == "fully_connected":
+        return [(i, j) for i in range(n_islands) for j in range(n_islands) if i != j]
+    return [(i, (i + rng.randint(1, n_islands)) % n_islands) for i in range(n_islands)]
+
+def migrate(islands: List[Dict[str, Any]], migration_size: int, topology: str, rng=np.random) -> int:
+    """Copy each source island's best genomes over the worst of its destinations (in place).
+
+    Emigrants are taken before any island is modified, and an island's current
+    best is never replaced. Returns the number of genomes moved.
+    """
+    n_islands = len(islands)
+    if n_islands < 2 or migration_size <= 0:
+        return 0
+    emigrants = {}
+    for i, isl in enumerate(islands):
+        top = np.argsort(isl["fitnesses"], kind="stable")[:migration_size]
+        emigrants[i] = (isl["population"][top].copy(), isl["fitnesses"][top].copy())
+    arrivals = defaultdict(list)
+    for src, dst in _routes(n_islands, topology, rng):
+        arrivals[dst].append(emigrants[src])
+
+    moved = 0
+    for dst, incoming in arrivals.items():
+        isl = islands[dst]
+        genomes = np.concatenate([g for g, _ in incoming])
+        fits = np.concatenate([f for _, f in incoming])
+        best = int(np.argmin(isl["fitnesses"]))
+        worst = [i for i in np.argsort(isl["fitnesses"], kind="stable")[::-1] if i != best]
+        n_moved = min(len(genomes), migration_size * len(incoming), len(worst))
+        order = np.argsort(fits, kind="stable")[:n_moved]
+        slots = worst[:n_moved]
+        isl["population"][slots] = genomes[order]
+        isl["fitnesses"][slots] = fits[order]
+        moved += n_moved
+    return moved
+
+def run_island_ga(
+    X: pd.DataFrame,
+    y: pd.Series,
+    model_factory: Callable,
+    pop_size: int = 50,
+    generations: int = 40,
+    crossover_rate: float = 0.8,
+    mutation_rate: float = 0.02,
+    cv: int = 5,
+    patience: int = 5,
+    verbose: bool = False,
+    seed: Optional[int] = None,
+    scoring: str = 'neg_mean_squared_error',
+    use_parallel: bool = True,
+    n_jobs: int = -1,
+    max_samples: int = 5000,
+    lambda_penalty: float = 0.05,
+    cache_size: int = 10000,
+    evaluator: str = "auto",
+    crossover: str = "one_point",
+    n_islands: int = 4,
+    migration_interval: int = 5,
+    migration_size: int = 2,
+    topology: str = "ring",
+    profile_dir: Optional[str] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Tuple[List[int], float, List[float], Dict[str, Any]]:
+    """Drop-in alternative to ``ga_optimized.run_ga`` using the island model.
+
+    ``pop_size`` is the total population, split evenly across islands, so a
+    run costs about as many evaluations per generation as the panmictic GA.
+    ``patience`` counts migration epochs without a global improvement.
+    """
+    t_start = time.perf_counter()
+    if crossover not in CROSSOVER_METHODS:
+        raise ValueError(f"Unknown crossover method: {crossover}")
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology: {topology}")
+    if n_islands < 1 or migration_interval < 1:
+        raise ValueError("n_islands and migration_interval must be at least 1")
+
+    island_size = max(4, pop_size // n_islands)
+    base_seed = seed if seed is not None else int(np.random.randint(0, 2**31 - 1))
+    rngs = [np.random.RandomState(base_seed + i) for i in range(n_islands)]
+    migration_rng = np.random.RandomState(base_seed)
+    islands = [
+        {"population": generate_population(island_size, X.shape[1], rng), "fitnesses": None, "rng_state": rng.get_state()}
+        for rng in rngs
+    ]
+    histories = [[] for _ in range(n_islands)]
+
+    # نفس العينة والطيّات لكل الجزر، فتبقى اللياقة قابلة للمقارنة عند الهجرة
+    plan = make_evaluation_plan(y, model_factory, cv, max_samples, seed)
+    X = feature_matrix(X)
+    X_eval = _take_rows(X, plan["rows"]) if plan["rows"] is not None else X
+    y_eval = _take_rows(y, plan["rows"]) if plan["rows"] is not None else y
+    cv_eval = plan["folds"]
+
+    # يُحدَّد المقيّم هنا حتى تظهر أخطاء الإعداد قبل تشغيل العمليات
+    engine = _resolve_evaluator(X_eval, y_eval, model_factory, cv_eval, scoring, max_samples, lambda_penalty, evaluator)
+    evaluator_name = "closed_form" if engine is not None else "sklearn"
+    n_workers = min(n_islands, effective_n_jobs(n_jobs)) if use_parallel else 1
+
+    executor = None
+    tmpdir = None
+    stop_path = None
+    local_state = {}
+    if n_workers > 1:
+        tmpdir, x_path = share_array(X_eval)
+        # العمليات العاملة لا تستطيع استدعاء should_stop؛ ملف علم في نفس المجلد المشترك
+        stop_path = os.path.join(tmpdir, STOP_FILE)
+        executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_island_worker,
+            initargs=(x_path, np.asarray(y_eval), model_factory, cv_eval, scoring, max_samples, lambda_penalty,
+                      evaluator_name, cache_size, profile_dir, stop_path if should_stop is not None else None)
+        )
+    else:
+        _setup_state(local_state, X_eval, y_eval, model_factory, cv_eval, scoring, max_samples, lambda_penalty,
+                     evaluator_name, cache_size, engine)
+        local_state["should_stop"] = should_stop
+
+    logger.info(f"Starting island GA: islands={n_islands}, island_size={island_size}, generations={generations}, "
+                f"migration_interval={migration_interval}, topology={topology}, workers={n_workers}, evaluator={evaluator_name}")
+
+    best_genome = None
+    best_fitness = float('inf')
+    history = []
+    evaluations = 0
+    cache_hits = 0
+    cache_sizes = [0] * n_islands
+    latency = LatencyHistogram()
+    migrations = 0
+    no_improve = 0
+    try:
+        while len(history) < generations:
+            n_gen = min(migration_interval, generations - len(history))
+            tasks = [
+                (i, isl["population"], isl["fitnesses"], isl["rng_state"], n_gen, crossover_rate, mutation_rate, crossover)
+                for i, isl in enumerate(islands)
+            ]
+            if executor is not None:
+                results = _gather([executor.submit(_evolve_in_worker, *task) for task in tasks], should_stop, stop_path)
+            else:
+                results = [_evolve(local_state, *task) for task in tasks]
+
+            improved = False
+            for res in results:
+                i = res["island"]
+                islands[i] = {k: res[k] for k in ("population", "fitnesses", "rng_state")}
+                histories[i].extend(res["history"])
+                evaluations += res["evaluations"]
+                cache_hits += res["cache_hits"]
+                cache_sizes[i] = res["cache_size"]
+                latency.merge(res["fitness_latency"])
+                idx = int(np.argmin(res["fitnesses"]))
+                if res["fitnesses"][idx] < best_fitness:
+                    best_fitness = float(res["fitnesses"][idx])
+                    best_genome = res["population"][idx].copy()
+                    improved = True
+
+            # عند الإيقاف قد تنهي الجزر أعدادًا مختلفة من الأجيال؛ السجل العام يتبع أقصرها
+            n_gen = min(len(res["history"]) for res in results)
+            start = len(history)
+            for g in range(n_gen):
+                gen_best = min(h[start + g] for h in histories)
+                history.append(min(gen_best, history[-1]) if history else gen_best)
+                if progress_callback is not None:
+                    progress_callback({
+                        "generation": len(history),
+                        "best_fitness": history[-1],
+                        "n_features": int(best_genome.sum()),
+                        "evaluations": evaluations,
+                        "cache_hits": cache_hits,
+                        "elapsed": time.perf_counter() - t_start
+                    })
+            if verbose:
+                logger.info(f"Gen {len(history)}: best fitness={best_fitness:.4f}, features={int(best_genome.sum())}, "
+                            f"island bests={[round(h[-1], 4) for h in histories]}")
+
+            no_improve = 0 if improved else no_improve + 1
+            if no_improve >= patience:
+                logger.info(f"Early stopping at generation {len(history)}")
+                break
+            if should_stop is not None and should_stop():
+                logger.info(f"Island GA stopped by caller at generation {len(history)}")
+                break
+            if len(history) < generations:
+                migrations += migrate(islands, migration_size, topology, migration_rng)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    stats = {
+        "evaluations": evaluations,
+        "evaluator": evaluator_name,
+        "cache_hits": cache_hits,
+        "cache_misses": evaluations,
+        "cache_size": sum(cache_sizes),
+        "evaluation_plan": plan_summary(plan),
+        "fitness_latency": latency.to_dict(),
+        "topology": topology,
+        "migrations": migrations,
+        "islands": [
+            {"island": i, "history": h, "best_fitness": h[-1] if h else None}
+            for i, h in enumerate(histories)
+        ]
+    }
+    logger.info(f"Island GA completed: best_fitness={best_fitness:.4f}, generations={len(history)}, "
+                f"evaluations={evaluations}, migrations={migrations}")
+    return best_genome.tolist(), best_fitness, history, stats
@@ -1,28 +1,64 @@
 
 """
 Optimized Genetic Algorithm with:
-- Parallel fitness evaluation
+- Parallel fitness evaluation on a persistent, memory-mapped worker pool
 - Smart sampling for large datasets
 - Feature count penalty for minimal feature selection
+- Fitness cache so duplicate genomes are never re-evaluated
+- Closed-form batched evaluation for linear / ridge regression
+- Population held as one 2-D uint8 array; selection, crossover and mutation
+  run for all offspring at once
+- Optional multi-fidelity evaluation: cheap single-split screening on a row
+  subsample, full CV only for the most promising genomes
+- Sparse (one-hot) feature frames are evaluated as a CSC matrix, so genome
+  columns are sliced without densifying
+- Optional surrogate screening: a ridge / random-forest model trained on all
+  scored genomes ranks a larger offspring pool, only the best go to real CV
 - Performance improvements
 """
-import random
-from typing import List, Tuple, Callable, Optional
+import time
+from collections import OrderedDict
+from typing import List, Tuple, Callable, Optional, Dict, Any
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import cross_val_score
-from joblib import Parallel, delayed
+import scipy.sparse as sp
+from sklearn.base import is_classifier
+from sklearn.model_selection import cross_val_score, KFold, ShuffleSplit, StratifiedKFold, StratifiedShuffleSplit
+from joblib import effective_n_jobs
 import logging
+from .data import is_sparse_frame, sparse_values
+from .linear_engine import build_linear_engine
+from .surrogate import FitnessSurrogate
+from .timing import LatencyHistogram, timed_batches
+from .worker_pool import FitnessPool
 logger = logging.getLogger(__name__)
 
-def generate_genome(length: int) -> np.ndarray:
-    genome = np.random.randint(0, 2, length, dtype=np.int8)
-    if not genome.any():
-        genome[np.random.randint(length)] = 1
-    return genome
+CROSSOVER_METHODS = ("one_point", "uniform")
 
-def generate_population(size: int, genome_length: int) -> List[np.ndarray]:
-    return [generate_genome(genome_length) for _ in range(size)]
+def repair_empty(population: np.ndarray, rng=np.random) -> None:
+    """Switch on one random feature in every all-zero row (in place)."""
+    empty = np.where(~population.any(axis=1))[0]
+    if len(empty):
+        population[empty, rng.randint(0, population.shape[1], len(empty))] = 1
+
+def generate_population(size: int, genome_length: int, rng=np.random) -> np.ndarray:
+    population = rng.randint(0, 2, (size, genome_length)).astype(np.uint8)
+    repair_empty(population, rng)
+    return population
+
+def _take_rows(data, indices):
+    return data.iloc[indices] if isinstance(data, (pd.DataFrame, pd.Series)) else data[indices]
+
+def _take_columns(X, cols):
+    return X.iloc[:, cols] if isinstance(X, pd.DataFrame) else X[:, cols]
+
+def feature_matrix(X):
+    """X as the GA evaluates it: sparse frames/matrices become CSC (cheap column slicing), the rest is unchanged."""
+    if is_sparse_frame(X):
+        return sparse_values(X).tocsc()
+    if sp.issparse(X):
+        return sp.csc_matrix(X)
+    return X
 
 def fitness(
     genome: np.ndarray,
@@ -39,13 +75,13 @@ def fitness(
     if n_selected == 0:
         return float('inf')
     
-    X_subset = X.iloc[:, selected_cols]
+    X_subset = _take_columns(X, selected_cols)
     
     #  أخذ عينة عشوائية إذا كانت البيانات كبيرة
-    if len(X_subset) > max_samples:
-        indices = np.random.choice(len(X_subset), size=max_samples, replace=False)
-        X_sample = X_subset.iloc[indices]
-        y_sample = y.iloc[indices]
+    if X_subset.shape[0] > max_samples:
+        indices = np.random.choice(X_subset.shape[0], size=max_samples, replace=False)
+        X_sample = _take_rows(X_subset, indices)
+        y_sample = _take_rows(y, indices)
     else:
         X_sample = X_subset
         y_sample = y
@@ -63,44 +99,279 @@ def fitness(
         logger.warning(f"Fitness evaluation failed: {e}")
         return float('inf')
 
-def fitness_parallel_wrapper(genome, X, y, model_factory, cv, scoring, max_samples, lambda_penalty):
-    return fitness(genome, X, y, model_factory, cv, scoring, max_samples, lambda_penalty)
+class FitnessCache:
+    """Bounded LRU cache of genome fitness values keyed by the packed bitmask."""
 
-def evaluate_population_parallel(
-    population: List[np.ndarray],
-    X: pd.DataFrame,
-    y: pd.Series,
-    model_factory: Callable,
-    cv: int,
-    scoring: str,
-    n_jobs: int = -1,
-    max_samples: int = 5000,
-    lambda_penalty: float = 0.05
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(genome: np.ndarray) -> bytes:
+        return np.packbits(np.asarray(genome, dtype=np.uint8)).tobytes()
+
+    def peek(self, key: bytes) -> Optional[float]:
+        """Lookup without touching hit/miss counters or LRU order."""
+        return self._data.get(key)
+
+    def get(self, key: bytes) -> Optional[float]:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: bytes, value: float) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def training_data(self, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+        """All cached genomes (unpacked, oldest first) and their fitness values."""
+        if not self._data:
+            return np.empty((0, n_features), dtype=np.uint8), np.empty(0)
+        packed = np.frombuffer(b"".join(self._data.keys()), dtype=np.uint8).reshape(len(self._data), -1)
+        return np.unpackbits(packed, axis=1, count=n_features), np.fromiter(self._data.values(), dtype=float)
+
+    def stats(self) -> Dict[str, int]:
+        return {"cache_hits": self.hits, "cache_misses": self.misses, "cache_size": len(self._data)}
+
+def evaluate_with_cache(
+    population: np.ndarray,
+    cache: FitnessCache,
+    evaluate_batch: Callable[[np.ndarray], List[float]]
 ) -> List[float]:
-    fitnesses = Parallel(n_jobs=n_jobs, prefer="processes")(
-        delayed(fitness_parallel_wrapper)(g, X, y, model_factory, cv, scoring, max_samples, lambda_penalty)
-        for g in population
-    )
+    """Score a population, evaluating each distinct uncached genome exactly once."""
+    population = np.asarray(population, dtype=np.uint8)
+    # مفاتيح كل الصفوف بعملية packbits واحدة
+    keys = [row.tobytes() for row in np.packbits(population, axis=1)]
+    fitnesses = [None] * len(population)
+    pending = {}
+    for i, key in enumerate(keys):
+        if key in pending:
+            # نسخة مكررة داخل نفس الجيل: تُحسب مرة واحدة فقط
+            cache.hits += 1
+            pending[key].append(i)
+            continue
+        cached = cache.get(key)
+        if cached is None:
+            pending[key] = [i]
+        else:
+            fitnesses[i] = cached
+
+    if pending:
+        todo = population[[idx[0] for idx in pending.values()]]
+        for (key, idx), value in zip(pending.items(), evaluate_batch(todo)):
+            value = float(value)
+            cache.put(key, value)
+            for i in idx:
+                fitnesses[i] = value
     return fitnesses
 
-def tournament_selection(pop, fitnesses, k=3):
-    participants = np.random.choice(len(pop), k, replace=False)
-    winner_idx = participants[np.argmin([fitnesses[i] for i in participants])]
-    return pop[winner_idx].copy()
-
-def one_point_crossover(a, b):
-    if len(a) < 2:
-        return a.copy(), b.copy()
-    point = np.random.randint(1, len(a))
-    child1 = np.concatenate([a[:point], b[point:]])
-    child2 = np.concatenate([b[:point], a[point:]])
+def evaluate_multi_fidelity(
+    population: np.ndarray,
+    cache: FitnessCache,
+    low_cache: FitnessCache,
+    evaluate_low: Callable[[np.ndarray], List[float]],
+    evaluate_full: Callable[[np.ndarray], List[float]],
+    promote_fraction: float = 0.3
+) -> Tuple[List[float], List[str]]:
+    """Successive-halving style scoring of one generation.
+
+    Genomes without a cached full-CV fitness are first scored at low fidelity;
+    the best ``promote_fraction`` of them get the full CV. The others keep
+    their low-fidelity score, shifted so that they rank after every full-CV
+    fitness in the generation (order among them is preserved), so selection
+    and elitism never prefer an unconfirmed genome. Only full-CV values enter
+    ``cache``. Returns fitness values and the fidelity (``"full"``/``"low"``)
+    each came from.
+    """
+    population = np.asarray(population, dtype=np.uint8)
+    keys = [row.tobytes() for row in np.packbits(population, axis=1)]
+    fitnesses = [None] * len(population)
+    fidelity = ["full"] * len(population)
+    unknown = {}
+    for i, key in enumerate(keys):
+        if key in unknown:
+            unknown[key].append(i)
+            continue
+        cached = cache.peek(key)
+        if cached is None:
+            unknown[key] = [i]
+        else:
+            cache.hits += 1
+            fitnesses[i] = cached
+    if not unknown:
+        return fitnesses, fidelity
+
+    pending = list(unknown)
+    first = [unknown[k][0] for k in pending]
+    low_values = np.asarray(evaluate_with_cache(population[first], low_cache, evaluate_low), dtype=float)
+    order = np.argsort(low_values, kind="stable")
+    n_promote = max(1, int(np.ceil(promote_fraction * len(pending))))
+    promoted, rest = order[:n_promote], order[n_promote:]
+
+    for j, value in zip(promoted, evaluate_full(population[[first[j] for j in promoted]])):
+        value = float(value)
+        cache.misses += 1
+        cache.put(pending[j], value)
+        for i in unknown[pending[j]]:
+            fitnesses[i] = value
+
+    if len(rest):
+        full = [f for f in fitnesses if f is not None and np.isfinite(f)]
+        shift = max(0.0, max(full) - low_values[rest[0]]) if full and np.isfinite(low_values[rest[0]]) else 0.0
+        for j in rest:
+            for i in unknown[pending[j]]:
+                fitnesses[i] = float(low_values[j] + shift)
+                fidelity[i] = "low"
+    return fitnesses, fidelity
+
+def make_evaluation_plan(
+    y,
+    model_factory: Callable,
+    cv=5,
+    max_samples: int = 5000,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """Row sample and CV folds fixed once per run and shared by every evaluation.
+
+    Classifiers get a stratified sample and StratifiedKFold folds (what
+    cross_val_score uses for an integer ``cv``), regressors a uniform sample
+    and KFold. ``rows`` is None when all rows fit in ``max_samples``; fold
+    indices are positions within the sampled rows.
+    """
+    rng = np.random.RandomState(seed)
+    y_arr = np.asarray(y)
+    stratified = is_classifier(model_factory())
+    rows = None
+    if len(y_arr) > max_samples:
+        if stratified:
+            try:
+                sampler = StratifiedShuffleSplit(n_splits=1, train_size=max_samples, random_state=rng)
+                rows = next(sampler.split(np.zeros(len(y_arr)), y_arr))[0]
+            except ValueError:
+                rows = None
+        if rows is None:
+            rows = rng.choice(len(y_arr), size=max_samples, replace=False)
+        y_arr = y_arr[rows]
+
+    if not isinstance(cv, (int, np.integer)):
+        folds = list(cv.split(np.zeros(len(y_arr)), y_arr))
+    else:
+        try:
+            splitter = StratifiedKFold(n_splits=cv) if stratified else KFold(n_splits=cv)
+            folds = list(splitter.split(np.zeros(len(y_arr)), y_arr))
+        except ValueError:
+            # فئة أصغر من عدد الطيّات: تقسيم عادي
+            stratified = False
+            folds = list(KFold(n_splits=cv).split(np.zeros(len(y_arr))))
+    return {"rows": rows, "folds": folds, "stratified": stratified}
+
+def plan_summary(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-friendly description of an evaluation plan, with test folds as original row positions."""
+    rows = plan["rows"]
+    return {
+        "n_rows": len(rows) if rows is not None else sum(len(test) for _, test in plan["folds"]),
+        "stratified": plan["stratified"],
+        "rows": rows.tolist() if rows is not None else None,
+        "test_folds": [(rows[test] if rows is not None else test).tolist() for _, test in plan["folds"]]
+    }
+
+def low_fidelity_split(y, model_factory: Callable, n_samples: int, seed: Optional[int] = None):
+    """Row subsample and single train/test split used for low-fidelity screening."""
+    rng = np.random.RandomState(None if seed is None else seed + 1)
+    rows = np.sort(rng.choice(len(y), size=min(n_samples, len(y)), replace=False))
+    y_low = np.asarray(y)[rows]
+    if is_classifier(model_factory()):
+        splitter = StratifiedShuffleSplit(n_splits=1, test_size=0.25, random_state=seed)
+        try:
+            next(splitter.split(np.zeros(len(rows)), y_low))
+        except ValueError:
+            # فئات نادرة جدًا في العينة: تقسيم عادي بدل الطبقي
+            splitter = ShuffleSplit(n_splits=1, test_size=0.25, random_state=seed)
+    else:
+        splitter = ShuffleSplit(n_splits=1, test_size=0.25, random_state=seed)
+    return rows, splitter
+
+def tournament_selection(fitnesses, n: int, k: int = 3, rng=np.random) -> np.ndarray:
+    """Indices of ``n`` tournament winners; each tournament draws ``k`` distinct individuals."""
+    fitnesses = np.asarray(fitnesses, dtype=float)
+    k = min(k, len(fitnesses))
+    # ترتيب عشوائي لكل بطولة، ثم أول k مشاركين بدون تكرار
+    participants = np.argsort(rng.random((n, len(fitnesses))), axis=1)[:, :k]
+    winners = np.argmin(fitnesses[participants], axis=1)
+    return participants[np.arange(n), winners]
+
+def crossover(
+    parents_a: np.ndarray,
+    parents_b: np.ndarray,
+    crossover_rate: float,
+    method: str = "one_point",
+    rng=np.random
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Recombine row pairs; pairs not drawn under ``crossover_rate`` are copied unchanged."""
+    n, length = parents_a.shape
+    if method == "one_point":
+        if length < 2:
+            return parents_a.copy(), parents_b.copy()
+        points = rng.randint(1, length, n)
+        take_a = np.arange(length) < points[:, None]
+    elif method == "uniform":
+        take_a = rng.random((n, length)) < 0.5
+    else:
+        raise ValueError(f"Unknown crossover method: {method}")
+    take_a[rng.random(n) >= crossover_rate] = True
+    child1 = np.where(take_a, parents_a, parents_b)
+    child2 = np.where(take_a, parents_b, parents_a)
     return child1, child2
 
-def mutate(genome, mutation_rate):
-    mutations = np.random.random(len(genome)) < mutation_rate
-    genome[mutations] = 1 - genome[mutations]
-    if not genome.any():
-        genome[np.random.randint(len(genome))] = 1
+def mutate(population: np.ndarray, mutation_rate: float, rng=np.random) -> None:
+    """Bit-flip mutation over the whole population (in place).
+
+    Flip positions are drawn as geometric gaps between successive flips, which
+    is exactly Bernoulli(mutation_rate) per bit but costs O(flips) random
+    numbers instead of one per bit.
+    """
+    total = population.size
+    if mutation_rate >= 1:
+        population ^= 1
+    elif mutation_rate > 0 and total:
+        pos = -1
+        while True:
+            batch = int(total * mutation_rate * 1.2) + 16
+            positions = pos + np.cumsum(rng.geometric(mutation_rate, batch))
+            inside = positions[positions < total]
+            # المواقع متزايدة تمامًا، فلا يُقلب أي بت مرتين
+            population[np.unravel_index(inside, population.shape)] ^= 1
+            if len(inside) < batch:
+                break
+            pos = positions[-1]
+    repair_empty(population, rng)
+
+def breed(
+    population: np.ndarray,
+    fitnesses,
+    n_offspring: int,
+    crossover_rate: float,
+    mutation_rate: float,
+    method: str = "one_point",
+    rng=np.random
+) -> np.ndarray:
+    n_pairs = (n_offspring + 1) // 2
+    parents = population[tournament_selection(fitnesses, 2 * n_pairs, rng=rng)]
+    child1, child2 = crossover(parents[:n_pairs], parents[n_pairs:], crossover_rate, method, rng)
+    offspring = np.concatenate([child1, child2])[:n_offspring]
+    mutate(offspring, mutation_rate, rng)
+    return offspring
 
 def run_ga(
     X: pd.DataFrame,
@@ -118,10 +389,27 @@ def run_ga(
     use_parallel: bool = True,
     n_jobs: int = -1,
     max_samples: int = 5000,
-    lambda_penalty: float = 0.05
-) -> Tuple[np.ndarray, float, List[float]]:
+    lambda_penalty: float = 0.05,
+    cache_size: int = 10000,
+    evaluator: str = "auto",
+    crossover: str = "one_point",
+    multi_fidelity: Optional[bool] = False,
+    low_fidelity_samples: int = 500,
+    promote_fraction: float = 0.3,
+    incremental: bool = False,
+    surrogate: Optional[str] = None,
+    surrogate_pool: int = 4,
+    surrogate_explore: float = 0.1,
+    profile_dir: Optional[str] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Tuple[List[int], float, List[float], Dict[str, Any]]:
+    t_start = time.perf_counter()
+    if crossover not in CROSSOVER_METHODS:
+        raise ValueError(f"Unknown crossover method: {crossover}")
+    if surrogate is not None and surrogate_pool < 1:
+        raise ValueError("surrogate_pool must be at least 1")
     if seed is not None:
-        random.seed(seed)
         np.random.seed(seed)
     
     genome_length = X.shape[1]
@@ -130,51 +418,158 @@ def run_ga(
     best_fitness = float('inf')
     history = []
     no_improve = 0
+    cache = FitnessCache(cache_size)
+    # surrogate: يُولَّد surrogate_pool أضعاف الأبناء ويُقيَّم فعليًا الأفضل تنبؤًا فقط
+    surrogate_model = FitnessSurrogate(surrogate, seed) if surrogate is not None else None
+    predictions = {}
+    surrogate_history = []
 
-    logger.info(f"Starting GA: pop_size={pop_size}, generations={generations}, parallel={use_parallel}, lambda_penalty={lambda_penalty}")
+    # العينة والطيّات تُثبَّت مرة واحدة: نفس الجينوم => نفس اللياقة في كل تقييم
+    plan = make_evaluation_plan(y, model_factory, cv, max_samples, seed)
+    X = feature_matrix(X)
+    X_eval = _take_rows(X, plan["rows"]) if plan["rows"] is not None else X
+    y_eval = _take_rows(y, plan["rows"]) if plan["rows"] is not None else y
+    cv_eval = plan["folds"]
 
-    for gen in range(generations):
-        if use_parallel:
-            fitnesses = evaluate_population_parallel(
-                population, X, y, model_factory, cv, scoring, n_jobs, max_samples, lambda_penalty
-            )
-        else:
-            fitnesses = [
-                fitness(g, X, y, model_factory, cv, scoring, max_samples, lambda_penalty)
-                for g in population
-            ]
-
-        current_best_idx = int(np.argmin(fitnesses))
-        current_best = fitnesses[current_best_idx]
-        if current_best < best_fitness:
-            best_fitness = current_best
-            best_genome = population[current_best_idx].copy()
-            no_improve = 0
-            if verbose:
-                n_features = best_genome.sum()
-                logger.info(f"Gen {gen}: New best fitness={best_fitness:.4f}, features={n_features}")
-        else:
-            no_improve += 1
+    # "auto": محرك الصيغة المغلقة عند دعمه، وإلا cross_val_score
+    engine = None
+    if evaluator in ("auto", "closed_form"):
+        # incremental: الأبناء القريبون من جينوم سابق يُحسبون بتحديثات رتبة واحدة
+        engine = build_linear_engine(X_eval, y_eval, model_factory, cv_eval, scoring, max_samples, lambda_penalty,
+                                     incremental=incremental)
+        if engine is None and evaluator == "closed_form":
+            raise ValueError("Closed-form evaluator supports only LinearRegression/Ridge with MSE scoring")
+    elif evaluator != "sklearn":
+        raise ValueError(f"Unknown evaluator: {evaluator}")
 
-        history.append(best_fitness)
+    # None: تلقائي لمسار sklearn فقط وعندما تكون البيانات أكبر بكثير من عينة الفحص؛
+    # مع الصيغة المغلقة يكلف التقييم الكامل تقريبًا ما يكلفه الفحص فلا فائدة منه
+    if multi_fidelity is None:
+        multi_fidelity = engine is None and len(y_eval) >= 4 * low_fidelity_samples
+    # عينة الفحص جزء من صفوف التقييم الكامل
+    low_fidelity = low_fidelity_split(y_eval, model_factory, low_fidelity_samples, seed) if multi_fidelity else None
+
+    pool = None
+    evaluate_low = None
+    if engine is not None:
+        evaluate_batch = engine.evaluate
+        if low_fidelity is not None:
+            rows, low_cv = low_fidelity
+            evaluate_low = build_linear_engine(_take_rows(X_eval, rows), _take_rows(y_eval, rows), model_factory,
+                                               low_cv, scoring, max_samples, lambda_penalty).evaluate
+    elif use_parallel and effective_n_jobs(n_jobs) > 1:
+        # مجمع عمليات واحد طوال التشغيل؛ البيانات تُرسل مرة واحدة فقط
+        pool = FitnessPool(X_eval, y_eval, model_factory, cv_eval, scoring, max_samples, lambda_penalty, n_jobs,
+                           low_fidelity=low_fidelity, profile_dir=profile_dir)
+        evaluate_batch = pool.evaluate
+        if low_fidelity is not None:
+            def evaluate_low(genomes):
+                return pool.evaluate(genomes, low=True)
+    else:
+        def evaluate_batch(genomes):
+            return [fitness(g, X_eval, y_eval, model_factory, cv_eval, scoring, max_samples, lambda_penalty) for g in genomes]
+        if low_fidelity is not None:
+            rows, low_cv = low_fidelity
+            X_low, y_low = _take_rows(X_eval, rows), _take_rows(y_eval, rows)
+            def evaluate_low(genomes):
+                return [fitness(g, X_low, y_low, model_factory, low_cv, scoring, max_samples, lambda_penalty) for g in genomes]
+    # زمن كل تقييم كامل (متوسط الدفعة لكل جينوم)، للتقارير و /metrics
+    latency = LatencyHistogram()
+    evaluate_batch = timed_batches(evaluate_batch, latency)
+    low_cache = FitnessCache(cache_size)
+    fidelity_history = []
 
-        if no_improve >= patience:
-            logger.info(f"Early stopping at generation {gen}")
-            break
+    evaluator_name = "closed_form" if engine is not None else "sklearn"
+    logger.info(f"Starting GA: pop_size={pop_size}, generations={generations}, parallel={pool is not None}, "
+                f"lambda_penalty={lambda_penalty}, evaluator={evaluator_name}, multi_fidelity={multi_fidelity}")
+
+    try:
+        for gen in range(generations):
+            if multi_fidelity:
+                fitnesses, fidelity = evaluate_multi_fidelity(population, cache, low_cache, evaluate_low,
+                                                              evaluate_batch, promote_fraction)
+                fidelity_history.append({"full": fidelity.count("full"), "low": fidelity.count("low")})
+            else:
+                fitnesses = evaluate_with_cache(population, cache, evaluate_batch)
+            if predictions:
+                # دقة تنبؤات الجيل السابق مقابل اللياقة الفعلية (التحقق الكامل فقط)
+                surrogate_history[-1].update(FitnessSurrogate.accuracy(predictions, cache.peek))
+                predictions = {}
 
-        elite = best_genome.copy()
-        new_pop = [elite]
-        while len(new_pop) < pop_size:
-            parent1 = tournament_selection(population, fitnesses)
-            parent2 = tournament_selection(population, fitnesses)
-            if random.random() < crossover_rate:
-                child1, child2 = one_point_crossover(parent1, parent2)
+            if multi_fidelity:
+                # الأفضل يُختار فقط من اللياقات المؤكدة بالتحقق الكامل؛ بدونها لا يُحدَّث
+                full_idx = [i for i, d in enumerate(fidelity) if d == "full"]
+                current_best_idx = full_idx[int(np.argmin([fitnesses[i] for i in full_idx]))] if full_idx else None
             else:
-                child1, child2 = parent1.copy(), parent2.copy()
-            mutate(child1, mutation_rate)
-            mutate(child2, mutation_rate)
-            new_pop.extend([child1, child2])
-        population = new_pop[:pop_size]
-
-    logger.info(f"GA completed: best_fitness={best_fitness:.4f}, generations={len(history)}")
-    return best_genome.tolist(), best_fitness, history
\ No newline at end of file
+                current_best_idx = int(np.argmin(fitnesses))
+            current_best = fitnesses[current_best_idx] if current_best_idx is not None else float('inf')
+            if current_best < best_fitness:
+                best_fitness = current_best
+                best_genome = population[current_best_idx].copy()
+                no_improve = 0
+                if verbose:
+                    n_features = best_genome.sum()
+                    logger.info(f"Gen {gen}: New best fitness={best_fitness:.4f}, features={n_features}")
+            else:
+                no_improve += 1
+
+            history.append(best_fitness)
+            if progress_callback is not None:
+                progress_callback({
+                    "generation": gen + 1,
+                    "best_fitness": best_fitness,
+                    "n_features": int(best_genome.sum()) if best_genome is not None else 0,
+                    "evaluations": cache.misses,
+                    "cache_hits": cache.hits,
+                    "low_fidelity_evaluations": low_cache.misses,
+                    "surrogate_spearman": surrogate_history[-1].get("spearman") if surrogate_history else None,
+                    "elapsed": time.perf_counter() - t_start
+                })
+
+            if no_improve >= patience:
+                logger.info(f"Early stopping at generation {gen}")
+                break
+            if should_stop is not None and should_stop():
+                logger.info(f"GA stopped by caller at generation {gen}")
+                break
+
+            # النموذج يُدرَّب فقط بعد أن يتجمع ما يعادل جيلًا كاملًا من التقييمات
+            if surrogate_model is not None and len(cache) >= pop_size and surrogate_model.fit(*cache.training_data(genome_length)):
+                candidates = breed(population, fitnesses, surrogate_pool * (pop_size - 1), crossover_rate,
+                                   mutation_rate, crossover)
+                offspring, predictions = surrogate_model.screen(candidates, pop_size - 1, cache.peek, surrogate_explore)
+                surrogate_history.append({"generation": gen + 1, "trained_on": surrogate_model.n_train,
+                                          "candidates": len(candidates), "predicted": len(predictions)})
+            else:
+                offspring = breed(population, fitnesses, pop_size - 1, crossover_rate, mutation_rate, crossover)
+            # لا أفضل مؤكد بعد (كل التقييمات الكاملة فشلت): يُنقل أفضل الجيل كما هو
+            elite = best_genome if best_genome is not None else population[int(np.argmin(fitnesses))]
+            population = np.concatenate([elite[None, :], offspring])
+    finally:
+        if pool is not None:
+            pool.close()
+
+    stats = {"evaluations": cache.misses, "evaluator": evaluator_name, **cache.stats(),
+             "evaluation_plan": plan_summary(plan), "fitness_latency": latency.to_dict()}
+    if multi_fidelity:
+        stats["fidelity"] = {
+            "low_evaluations": low_cache.misses,
+            "full_evaluations": cache.misses,
+            "low_fidelity_samples": len(low_fidelity[0]),
+            "promote_fraction": promote_fraction,
+            "per_generation": fidelity_history
+        }
+    if incremental and engine is not None:
+        stats["incremental"] = engine.stats()
+    if surrogate_model is not None:
+        stats["surrogate"] = {
+            "model": surrogate,
+            "pool_factor": surrogate_pool,
+            "explore": surrogate_explore,
+            "per_generation": surrogate_history
+        }
+    if best_genome is None:
+        raise ValueError("No genome received a finite fitness; check the data and model")
+    logger.info(f"GA completed: best_fitness={best_fitness:.4f}, generations={len(history)}, "
+                f"evaluations={stats['evaluations']}, cache_hits={stats['cache_hits']}")
+    return best_genome.tolist(), best_fitness, history, stats
\ No newline at end of file
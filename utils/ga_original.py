@@ -1,5 +1,6 @@
 import random
-from typing import List, Tuple, Callable, Optional
+import time
+from typing import List, Tuple, Callable, Optional, Dict, Any
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import cross_val_score
@@ -79,8 +80,11 @@ def run_ga(
     seed: Optional[int] = None,
     scoring: str = 'neg_mean_squared_error',
     max_samples: int = 5000,
-    lambda_penalty: float = 0.05
-) -> Tuple[List[int], float, List[float]]:
+    lambda_penalty: float = 0.05,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Tuple[List[int], float, List[float], Dict[str, Any]]:
+    t_start = time.perf_counter()
     if seed is not None:
         random.seed(seed)
         np.random.seed(seed)
@@ -91,9 +95,11 @@ def run_ga(
     best_fitness = float('inf')
     history = []
     no_improve = 0
+    evaluations = 0
 
     for gen in range(generations):
         fitnesses = [fitness(g, X, y, model_factory, cv, scoring, max_samples, lambda_penalty) for g in population]
+        evaluations += len(population)
         current_best_idx = int(np.argmin(fitnesses))
         current_best = fitnesses[current_best_idx]
         if current_best < best_fitness:
@@ -103,8 +109,19 @@ def run_ga(
         else:
             no_improve += 1
         history.append(best_fitness)
+        if progress_callback is not None:
+            progress_callback({
+                "generation": gen + 1,
+                "best_fitness": best_fitness,
+                "n_features": sum(best_genome),
+                "evaluations": evaluations,
+                "cache_hits": 0,
+                "elapsed": time.perf_counter() - t_start
+            })
         if no_improve >= patience:
             break
+        if should_stop is not None and should_stop():
+            break
 
         elite = best_genome[:]
         new_pop = [elite]
@@ -122,4 +139,4 @@ def run_ga(
                 new_pop.pop()
         population = new_pop
 
-    return best_genome, best_fitness, history
\ No newline at end of file
+    return best_genome, best_fitness, history, {"evaluations": evaluations}
\ No newline at end of file
@@ -0,0 +1,415 @@
+"""
+Closed-form cross-validation engine for LinearRegression / Ridge fitness.
+
+Per-fold Gram matrices (X^T X, X^T y) are computed once per dataset; every
+genome's fold models are then solved by slicing the selected sub-matrices and
+solving the whole batch at once, which gives the same CV MSE as
+cross_val_score without building any sklearn estimator per genome. Without
+regularisation, selections with collinear columns (such as a full one-hot
+block) are detected from the Cholesky pivots and solved with eigh and an
+lstsq-style cutoff, giving the minimum-norm solution sklearn's lstsq returns.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+import logging
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.linalg import lapack
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import KFold
+
+logger = logging.getLogger(__name__)
+
+# حد أقصى لعدد العناصر في دفعة المصفوفات الجزئية (g * k * k) لتقييد الذاكرة
+MAX_BATCH_ELEMENTS = 4_000_000
+
+# حدود التحقق العددي: تجاوزها => حل بديل (حل كامل)
+SCHUR_TOL = 1e-10
+COND_LIMIT = 1e10
+# محور Cholesky أصغر من RANK_TOL * قطر العمود => عمود شبه تابع خطيًا؛ الإزاحة الصغيرة
+# تجعل المصفوفات المنفردة عدديًا قابلة للتحليل حتى يُقرأ محورها
+RANK_TOL = 1e-8
+CHOL_JITTER = 1e-12
+# قيم ذاتية لمصفوفة Gram أصغر من EIG_RCOND * الأكبر تُعد صفرًا (اتجاه متطابق خطيًا)
+EIG_RCOND = 1e-12
+
+def _min_norm_solve(A: np.ndarray, b: np.ndarray, rcond: float = EIG_RCOND) -> np.ndarray:
+    """Minimum-norm solution of a batch of symmetric PSD systems A beta = b, like lstsq on the design matrix."""
+    w, V = np.linalg.eigh(A)
+    cutoff = rcond * np.maximum(w[..., -1:], 0.0)
+    inv = np.where(w > cutoff, 1.0 / np.where(w > cutoff, w, 1.0), 0.0)
+    return np.einsum('...ij,...j->...i', V, inv * np.einsum('...ji,...j->...i', V, b))
+
+def _dense(M) -> np.ndarray:
+    return M.toarray() if sp.issparse(M) else np.asarray(M)
+
+class LinearCVEngine:
+    def __init__(
+        self,
+        X,
+        y,
+        cv: int = 5,
+        alpha: float = 0.0,
+        max_samples: int = 5000,
+        lambda_penalty: float = 0.05
+    ):
+        # مصفوفة متناثرة تبقى CSR؛ مصفوفات Gram وحدها تصبح كثيفة (F x F)
+        X_arr = sp.csr_matrix(X, dtype=np.float64) if sp.issparse(X) else np.asarray(X, dtype=np.float64)
+        y_arr = np.asarray(y, dtype=np.float64)
+        # نفس منطق العينة في fitness لكن تُسحب مرة واحدة لكل تشغيل
+        if X_arr.shape[0] > max_samples:
+            indices = np.random.choice(X_arr.shape[0], size=max_samples, replace=False)
+            X_arr = X_arr[indices]
+            y_arr = y_arr[indices]
+
+        self.alpha = float(alpha)
+        self.lambda_penalty = lambda_penalty
+        self.n_features = X_arr.shape[1]
+
+        # إزاحة الأعمدة بمتوسطها قبل بناء Gram: التمركز لكل طية يصبح طرح كميات صغيرة
+        # فلا تبتلع أخطاء التقريب القيم الذاتية الصغيرة (التنبؤات لا تتغير بسبب الحد الثابت)
+        if not sp.issparse(X_arr):
+            X_arr = X_arr - X_arr.mean(axis=0)
+
+        if sp.issparse(X_arr):
+            Z = sp.hstack([np.ones((X_arr.shape[0], 1)), X_arr], format='csr')
+        else:
+            Z = np.hstack([np.ones((len(X_arr), 1)), X_arr])
+        G_total = _dense(Z.T @ Z)
+        c_total = Z.T @ y_arr
+        yy_total = float(y_arr @ y_arr)
+
+        self.folds = []
+        # عدد صحيح => KFold كما في cross_val_score، أو مُقسِّم من sklearn، أو قائمة طيّات جاهزة
+        if isinstance(cv, (int, np.integer)):
+            splits = KFold(n_splits=cv).split(X_arr)
+        elif hasattr(cv, "split"):
+            splits = cv.split(X_arr, y_arr)
+        else:
+            splits = cv
+        for train_idx, test_idx in splits:
+            Z_te, y_te = Z[test_idx], y_arr[test_idx]
+            G_te = _dense(Z_te.T @ Z_te)
+            c_te = Z_te.T @ y_te
+            yy_te = float(y_te @ y_te)
+
+            # إحصاءات التدريب = الكلي - الاختبار، ثم التمركز حول متوسط التدريب
+            G_tr = G_total - G_te
+            c_tr = c_total - c_te
+            n_tr = G_tr[0, 0]
+            x_mean = G_tr[0, 1:] / n_tr
+            y_mean = c_tr[0] / n_tr
+            Cxx = G_tr[1:, 1:] - n_tr * np.outer(x_mean, x_mean)
+            Cxy = c_tr[1:] - n_tr * x_mean * y_mean
+            self.folds.append({
+                "Cxx": Cxx, "Cxy": Cxy, "x_mean": x_mean, "y_mean": y_mean,
+                "G_te": G_te, "c_te": c_te, "yy_te": yy_te, "n_te": len(test_idx)
+            })
+
+    def _solve(self, A: np.ndarray, b: np.ndarray) -> np.ndarray:
+        if self.alpha > 0:
+            A = A + self.alpha * np.eye(A.shape[-1])
+            return np.linalg.solve(A, b[..., None])[..., 0]
+        # Cholesky كاشف للرتبة: مربع المحور j هو تباين بقايا العمود j بعد انحداره على ما قبله،
+        # فيقارب الصفر عندما يكون العمود تركيبًا خطيًا من غيره (مثل one-hot الكامل)
+        diag = np.diagonal(A, axis1=-2, axis2=-1)
+        try:
+            L = np.linalg.cholesky(A + CHOL_JITTER * diag[..., None] * np.eye(A.shape[-1]))
+        except np.linalg.LinAlgError:
+            return _min_norm_solve(A, b)
+        pivots = np.diagonal(L, axis1=-2, axis2=-1) ** 2
+        deficient = (pivots <= RANK_TOL * diag).any(axis=-1)
+        beta = np.empty(b.shape)
+        ok = ~deficient
+        if ok.any():
+            beta[ok] = np.linalg.solve(A[ok], b[ok][..., None])[..., 0]
+        if deficient.any():
+            # حل أقل معيار مثل lstsq في LinearRegression
+            beta[deficient] = _min_norm_solve(A[deficient], b[deficient])
+        return beta
+
+    def _cv_mse(self, idx: np.ndarray) -> np.ndarray:
+        """Mean fold MSE for a batch of genomes sharing the same feature count."""
+        g, k = idx.shape
+        aug_idx = np.hstack([np.zeros((g, 1), dtype=idx.dtype), idx + 1])
+        total = np.zeros(g)
+        for fold in self.folds:
+            A = fold["Cxx"][idx[:, :, None], idx[:, None, :]]
+            beta = self._solve(A, fold["Cxy"][idx])
+            intercept = fold["y_mean"] - np.einsum('gi,gi->g', fold["x_mean"][idx], beta)
+            w = np.hstack([intercept[:, None], beta])
+
+            # SSE على طية الاختبار من مصفوفات Gram فقط، دون المرور على الصفوف
+            G_te = fold["G_te"][aug_idx[:, :, None], aug_idx[:, None, :]]
+            c_te = fold["c_te"][aug_idx]
+            sse = (fold["yy_te"]
+                   - 2.0 * np.einsum('gi,gi->g', w, c_te)
+                   + np.einsum('gi,gij,gj->g', w, G_te, w))
+            total += np.maximum(sse, 0.0) / fold["n_te"]
+        return total / len(self.folds)
+
+    def evaluate(self, genomes: Sequence[np.ndarray]) -> np.ndarray:
+        masks = np.asarray(genomes).astype(bool)
+        counts = masks.sum(axis=1)
+        results = np.full(len(masks), float('inf'))
+        for k in np.unique(counts):
+            if k == 0:
+                continue
+            rows = np.where(counts == k)[0]
+            idx_all = np.nonzero(masks[rows])[1].reshape(len(rows), k)
+            chunk = max(1, MAX_BATCH_ELEMENTS // int(k * k))
+            for start in range(0, len(rows), chunk):
+                sub = slice(start, start + chunk)
+                try:
+                    mse = self._cv_mse(idx_all[sub])
+                except np.linalg.LinAlgError as e:
+                    logger.warning(f"Closed-form fitness failed for k={k}: {e}")
+                    continue
+                results[rows[sub]] = mse + self.lambda_penalty * (k / self.n_features)
+        return results
+
+class IncrementalLinearEngine(LinearCVEngine):
+    """LinearCVEngine that scores near-neighbour genomes from a stored parent.
+
+    For genomes with at least ``min_features`` features the per-fold inverses
+    (X_S^T X_S + alpha I)^-1 are kept in an LRU store bounded by
+    ``memory_bytes``. A genome within ``max_changes`` bits of a stored one is
+    derived from it by rank-one Schur-complement updates, O(k^2) per changed
+    bit instead of an O(k^3) solve. An update is rejected when an added
+    column's Schur complement is below SCHUR_TOL of its diagonal, or when the
+    result fails the bound trace(A) * ||A^-1||_F <= COND_LIMIT; chains longer
+    than ``max_depth`` are refactored from scratch. Rejected genomes fall back
+    to the batched solve of the base class.
+
+    ``stats()`` counts every scored genome once: ``incremental`` (derived
+    from a parent), ``fallback`` (had a parent but the update was rejected),
+    ``full`` (no usable parent) and ``small`` (below ``min_features``).
+    """
+
+    def __init__(
+        self,
+        X,
+        y,
+        cv: int = 5,
+        alpha: float = 0.0,
+        max_samples: int = 5000,
+        lambda_penalty: float = 0.05,
+        min_features: int = 32,
+        max_changes: int = 4,
+        max_depth: int = 8,
+        memory_bytes: int = 256 * 1024 * 1024
+    ):
+        super().__init__(X, y, cv=cv, alpha=alpha, max_samples=max_samples, lambda_penalty=lambda_penalty)
+        self.min_features = min_features
+        self.max_changes = max_changes
+        self.max_depth = max_depth
+        self.memory_bytes = memory_bytes
+        self._store = OrderedDict()
+        self._stored_bytes = 0
+        self.counts = {"incremental": 0, "full": 0, "fallback": 0, "small": 0}
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+    def _fold_mse(self, fold, order: np.ndarray, beta: np.ndarray) -> float:
+        intercept = fold["y_mean"] - fold["x_mean"][order] @ beta
+        w = np.concatenate([[intercept], beta])
+        aug = np.concatenate([[0], order + 1])
+        G = fold["G_te"].take(aug, axis=0).take(aug, axis=1)
+        sse = fold["yy_te"] - 2.0 * (w @ fold["c_te"][aug]) + w @ G @ w
+        return max(sse, 0.0) / fold["n_te"]
+
+    def _mse_from_inverses(self, order: np.ndarray, inverses: List[np.ndarray]) -> Optional[float]:
+        """Mean fold MSE, or None when a fold system is too ill-conditioned to trust.
+
+        trace(A) * ||A^-1||_F bounds cond(A) from above without gathering A, so
+        an accepted system is full rank and its solution is the unique one.
+        Rank-deficient genomes are rejected here and get the minimum-norm
+        solution from the batched solve of the base class.
+        """
+        total = 0.0
+        for fold, P in zip(self.folds, inverses):
+            trace = fold["Cxx"].diagonal()[order].sum() + self.alpha * len(order)
+            if not trace * np.linalg.norm(P) <= COND_LIMIT:
+                return None
+            beta = P @ fold["Cxy"][order]
+            total += self._fold_mse(fold, order, beta)
+        return total / len(self.folds)
+
+    @staticmethod
+    def _drop(P: np.ndarray, p: int) -> np.ndarray:
+        col = np.delete(P[:, p], p)
+        out = np.delete(np.delete(P, p, axis=0), p, axis=1)
+        out -= np.outer(col, col) / P[p, p]
+        return out
+
+    def _add(self, fold, P: np.ndarray, order: List[int], j: int) -> np.ndarray:
+        a = fold["Cxx"][order, j]
+        d = fold["Cxx"][j, j] + self.alpha
+        u = P @ a
+        s = d - a @ u
+        if not s > SCHUR_TOL * abs(d):
+            raise np.linalg.LinAlgError("ill-conditioned incremental update")
+        k = len(P)
+        out = np.empty((k + 1, k + 1))
+        out[:k, :k] = P + np.outer(u, u) / s
+        out[:k, k] = out[k, :k] = -u / s
+        out[k, k] = 1.0 / s
+        return out
+
+    def _inverses(self, entry) -> Optional[List[np.ndarray]]:
+        """Per-fold inverses of a stored genome, factorised on first use as a parent."""
+        if entry["inverses"] is None:
+            order = entry["order"]
+            inverses = []
+            for fold in self.folds:
+                A = fold["Cxx"][np.ix_(order, order)]
+                if self.alpha > 0:
+                    A = A + self.alpha * np.eye(len(order))
+                c, info = lapack.dpotrf(A, lower=1)
+                if info == 0:
+                    P, info = lapack.dpotri(c, lower=1)
+                trace = np.trace(A)
+                if info != 0 or not trace * np.linalg.norm(P) <= COND_LIMIT:
+                    # غير موجبة التعريف عدديًا: لا يصلح أبًا
+                    entry["inverses"] = False
+                    return None
+                # dpotri يملأ المثلث السفلي فقط
+                P = np.tril(P) + np.tril(P, -1).T
+                inverses.append(P)
+            entry["inverses"] = inverses
+            size = sum(P.nbytes for P in inverses)
+            entry["bytes"] += size
+            self._stored_bytes += size
+        return entry["inverses"] or None
+
+    def _remember(self, mask: np.ndarray, order: np.ndarray, inverses: Optional[List[np.ndarray]], depth: int) -> None:
+        key = np.packbits(mask).tobytes()
+        size = sum(P.nbytes for P in inverses or ()) + mask.nbytes
+        old = self._store.pop(key, None)
+        if old is not None:
+            self._stored_bytes -= old["bytes"]
+        self._store[key] = {"mask": mask.copy(), "order": order, "inverses": inverses, "depth": depth, "bytes": size}
+        self._stored_bytes += size
+        while self._stored_bytes > self.memory_bytes and self._store:
+            _, evicted = self._store.popitem(last=False)
+            self._stored_bytes -= evicted["bytes"]
+
+    def _nearest(self, masks: np.ndarray) -> List[Optional[bytes]]:
+        """Closest stored genome (Hamming distance) for each mask, if within max_changes."""
+        if not self._store:
+            return [None] * len(masks)
+        keys = list(self._store)
+        stored = np.array([self._store[k]["mask"] for k in keys])
+        chunk = max(1, MAX_BATCH_ELEMENTS // stored.size)
+        parents = []
+        for start in range(0, len(masks), chunk):
+            dist = (masks[start:start + chunk, None, :] != stored[None, :, :]).sum(axis=2)
+            best = dist.argmin(axis=1)
+            for i, j in enumerate(best):
+                ok = dist[i, j] <= self.max_changes and self._store[keys[j]]["depth"] < self.max_depth
+                parents.append(keys[j] if ok else None)
+        return parents
+
+    def _evaluate_from(self, mask: np.ndarray, key: bytes) -> Optional[float]:
+        parent = self._store.get(key)
+        if parent is None:
+            # أُخرج من المخزن أثناء نفس الدفعة بسبب حد الذاكرة
+            return None
+        self._store.move_to_end(key)
+        parent_inverses = self._inverses(parent)
+        if parent_inverses is None:
+            return None
+        removed = [int(f) for f in parent["order"] if not mask[f]]
+        added = np.flatnonzero(mask & ~parent["mask"])
+        inverses = []
+        try:
+            for fold, P in zip(self.folds, parent_inverses):
+                order = parent["order"].tolist()
+                for f in removed:
+                    p = order.index(f)
+                    P = self._drop(P, p)
+                    order.pop(p)
+                for f in added:
+                    P = self._add(fold, P, order, int(f))
+                    order.append(int(f))
+                inverses.append(P)
+        except np.linalg.LinAlgError:
+            return None
+        order = np.asarray(order)
+        mse = self._mse_from_inverses(order, inverses)
+        if mse is not None:
+            self._remember(mask, order, inverses, parent["depth"] + 1)
+        return mse
+
+    def _evaluate_full(self, masks: np.ndarray) -> np.ndarray:
+        # نفس الحل الدفعي للصنف الأساسي؛ المعكوسات تُحسب لاحقًا فقط لمن يصبح أبًا
+        mse = super().evaluate(masks) - self.lambda_penalty * masks.sum(axis=1) / self.n_features
+        for mask, value in zip(masks, mse):
+            if np.isfinite(value):
+                self._remember(mask, np.flatnonzero(mask), None, 0)
+        return mse
+
+    def evaluate(self, genomes: Sequence[np.ndarray]) -> np.ndarray:
+        masks = np.asarray(genomes).astype(bool)
+        counts = masks.sum(axis=1)
+        results = np.full(len(masks), float('inf'))
+        small = np.where(counts < self.min_features)[0]
+        big = np.where(counts >= self.min_features)[0]
+        if len(small):
+            self.counts["small"] += len(small)
+            results[small] = super().evaluate(masks[small])
+        if not len(big):
+            return results
+
+        todo = []
+        for i, parent in zip(big, self._nearest(masks[big])):
+            if parent is None:
+                self.counts["full"] += 1
+                todo.append(i)
+                continue
+            mse = self._evaluate_from(masks[i], parent)
+            if mse is None:
+                # الأب موجود لكن التحديث رُفض (شرط Schur أو حد رقم الحالة)
+                self.counts["fallback"] += 1
+                todo.append(i)
+                continue
+            self.counts["incremental"] += 1
+            results[i] = mse + self.lambda_penalty * (counts[i] / self.n_features)
+        if todo:
+            todo = np.asarray(todo)
+            results[todo] = self._evaluate_full(masks[todo]) + self.lambda_penalty * (counts[todo] / self.n_features)
+        return results
+
+def build_linear_engine(
+    X: pd.DataFrame,
+    y: pd.Series,
+    model_factory: Callable,
+    cv: int = 5,
+    scoring: str = 'neg_mean_squared_error',
+    max_samples: int = 5000,
+    lambda_penalty: float = 0.05,
+    max_features: int = 2000,
+    incremental: bool = False
+) -> Optional[LinearCVEngine]:
+    """Return a closed-form engine if the model/scoring allow it, else None."""
+    if scoring != 'neg_mean_squared_error' or X.shape[1] > max_features:
+        return None
+    model = model_factory()
+    if type(model) is LinearRegression:
+        alpha = 0.0
+    elif type(model) is Ridge and np.isscalar(model.alpha):
+        alpha = float(model.alpha)
+    else:
+        return None
+    if not model.fit_intercept or getattr(model, 'positive', False):
+        return None
+    try:
+        X_values = sp.csr_matrix(X, dtype=np.float64) if sp.issparse(X) else np.asarray(X, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    if not np.isfinite(X_values.data if sp.issparse(X_values) else X_values).all():
+        return None
+    engine_cls = IncrementalLinearEngine if incremental else LinearCVEngine
+    return engine_cls(X_values, y, cv=cv, alpha=alpha, max_samples=max_samples, lambda_penalty=lambda_penalty)
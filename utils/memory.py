@@ -0,0 +1,99 @@
+"""
+Per-job memory budgeting.
+
+plan_memory() decides, from the encoded matrix shape, whether a job can keep
+X as float64, must downcast it to float32, or must also cap its row count so
+that the copies a run holds at its peak fit the budget. RssMonitor samples the
+process RSS while a job runs so the response can report what was actually used.
+"""
+import os
+import resource
+import threading
+from typing import Any, Dict, Optional
+import numpy as np
+
+# نسخ X التي تعيش معًا في ذروة التشغيل: المصفوفة نفسها، نسخة التعويض للمقارنات، ونسخ طيّات CV
+WORKING_COPIES = 3
+# لا يُقلَّص عدد الصفوف تحت هذا الحد مهما كانت الميزانية
+MIN_ROWS = 1000
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+def peak_rss() -> int:
+    """High-water RSS in bytes of this process."""
+    # ru_maxrss بالكيلوبايت على لينكس
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def plan_memory(n_rows: int, n_features: int, budget_bytes: Optional[int], nnz: Optional[int] = None) -> Dict[str, Any]:
+    """dtype and row cap for an ``n_rows x n_features`` matrix under ``budget_bytes``.
+
+    ``nnz`` switches the estimate to CSR storage (value + column index per
+    stored entry). Rows are never capped below MIN_ROWS, so a tiny budget can
+    still be exceeded.
+    """
+    def matrix_bytes(itemsize: int) -> int:
+        if nnz is not None:
+            return nnz * (itemsize + 4)
+        return n_rows * n_features * itemsize
+
+    plan = {"budget_bytes": budget_bytes, "dtype": "float64", "max_rows": None,
+            "estimated_bytes": matrix_bytes(8) * WORKING_COPIES}
+    if budget_bytes is None or plan["estimated_bytes"] <= budget_bytes:
+        return plan
+    plan["dtype"] = "float32"
+    plan["estimated_bytes"] = matrix_bytes(4) * WORKING_COPIES
+    if plan["estimated_bytes"] > budget_bytes and n_rows > MIN_ROWS:
+        per_row = plan["estimated_bytes"] / n_rows
+        plan["max_rows"] = max(MIN_ROWS, int(budget_bytes / per_row))
+        plan["estimated_bytes"] = int(per_row * plan["max_rows"])
+    return plan
+
+def budget_rows(n_rows: int, max_rows: Optional[int], seed: int = 0) -> Optional[np.ndarray]:
+    """Sorted random row subset of size ``max_rows`` (None when no cap applies)."""
+    if max_rows is None or n_rows <= max_rows:
+        return None
+    return np.sort(np.random.RandomState(seed).choice(n_rows, size=max_rows, replace=False))
+
+class RssMonitor:
+    """Samples the process RSS in a daemon thread between start() and stop().
+
+    Jobs share the process, so the peak covers everything running
+    concurrently; it is an upper bound for a single job. Pool workers are not
+    covered: RUSAGE_CHILDREN only reports the largest child the server ever
+    reaped, not the ones serving this job.
+    """
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss())
+
+    def start(self) -> "RssMonitor":
+        self.start_bytes = self.peak_bytes = current_rss()
+        self._thread = threading.Thread(target=self._sample, name="rss-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, int]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        end = current_rss()
+        self.peak_bytes = max(self.peak_bytes, end)
+        return {
+            "rss_start_bytes": self.start_bytes,
+            "rss_end_bytes": end,
+            "peak_rss_bytes": self.peak_bytes
+        }
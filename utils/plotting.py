@@ -1,13 +1,9 @@
+import matplotlib
+matplotlib.use("Agg")  # rendering happens in background job threads, never on a GUI
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
-
-def jaccard(a, b):
-    A = set(a)
-    B = set(b)
-    if not A and not B:
-        return 1.0
-    return len(A & B) / len(A | B)
+from utils.charts import chart_series
 
 def plot_results(parsed, outdir: Path, ds_name: str = None):
     title_suffix = f" - {ds_name}" if ds_name else ''
@@ -37,33 +33,18 @@ def plot_results(parsed, outdir: Path, ds_name: str = None):
             plt.close()
 
 def plot_comparisons(parsed, outdir: Path, ds_name: str = None):
-    comps = parsed.get('comparisons', {})
-    is_classification = parsed.get('is_classification', False)
+    series = chart_series(parsed)
+    is_classification = series['higher_is_better']
     metric_label = "Accuracy" if is_classification else "MSE"
     xlabel_metric = f'CV {metric_label} ({("higher" if is_classification else "lower")} is better)'
 
     title_suffix = f" - {ds_name}" if ds_name else ''
 
-    methods = []
-    metrics = []  # will hold MSE or Accuracy
-    counts = []
-    times = []
-
-    # Add GA
-    methods.append('GA')
-    metrics.append(parsed.get('best_mse'))  # already converted in main.py
-    counts.append(len(parsed.get('selected', [])))
-    times.append(parsed.get('ga_time', 0.0))
-
-    # Add other methods
-    order = ['SelectKBest', 'VarianceThreshold', 'MutualInfo_topK', 'LassoCV', 'RandomForest_topK', 'RFE']
-    for name in order:
-        if name in comps:
-            v = comps[name]
-            methods.append(name)
-            metrics.append(v.get('cv_mse'))
-            counts.append(len(v.get('selected', []) or []))
-            times.append(v.get('time_s', 0.0))
+    rows = series['methods']
+    methods = [r['method'] for r in rows]
+    metrics = [r['score'] for r in rows]  # MSE or Accuracy
+    counts = [r['n_selected'] for r in rows]
+    times = [r['time_s'] for r in rows]
 
     # Plot Metric (MSE or Accuracy)
     try:
@@ -92,15 +73,8 @@ def plot_comparisons(parsed, outdir: Path, ds_name: str = None):
         print(f"Plot error (counts): {e}")
 
     # Plot Jaccard similarity
-    ga_sel = parsed.get('selected', [])
-    jac_vals = []
-    names = []
-    for name in order:
-        if name in comps:
-            sel = comps[name].get('selected', []) or []
-            jac = jaccard(ga_sel, sel)
-            jac_vals.append(jac)
-            names.append(name)
+    names = [r['method'] for r in rows[1:]]
+    jac_vals = [r['jaccard_with_ga'] for r in rows[1:]]
     if jac_vals:
         try:
             plt.figure(figsize=(8, 4))
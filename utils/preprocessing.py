@@ -0,0 +1,273 @@
+"""
+Fitted tabular preprocessing: top-N grouping, one-hot encoding and mean
+imputation as one reusable object.
+
+fit() learns everything that depends on the training data (categorical
+columns and their categories, the target, imputation means); transform()
+applies it to any frame with the same columns, so new data is encoded into
+exactly the training columns. Each stage is a vectorized pass over all the
+columns it touches, and ``timings`` records the seconds spent per stage of the
+last call. The fitted state round-trips through JSON (to_dict / from_dict).
+"""
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+# الترميز المتناثر (CSR) يُختار تلقائيًا للمصفوفات الكبيرة قليلة الكثافة بعد one-hot
+SPARSE_MIN_CELLS = 5_000_000
+SPARSE_MAX_DENSITY = 0.25
+
+OTHER = 'OTHER'
+
+def _is_categorical(dtype) -> bool:
+    return dtype == object or isinstance(dtype, pd.CategoricalDtype)
+
+def _is_number(dtype) -> bool:
+    # مثل select_dtypes(include='number'): القيم المنطقية ليست أرقامًا
+    return is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+class TabularPreprocessor:
+    """Encode / group / impute pipeline producing the same (X, y) as prepare_dataframe().
+
+    ``sparse=True`` returns X as a DataFrame of SparseDtype columns backed by
+    a CSR matrix, ``None`` picks that automatically at fit time for wide,
+    low-density one-hot encodings.
+    """
+
+    def __init__(
+        self,
+        group_top: int = 0,
+        drop_numeric_features: bool = False,
+        target: Optional[str] = None,
+        drop_cols: Optional[List[str]] = None,
+        max_cardinality: Optional[int] = None,
+        sparse: Optional[bool] = False
+    ):
+        self.group_top = group_top
+        self.drop_numeric_features = drop_numeric_features
+        self.target = target
+        self.drop_cols = list(drop_cols) if drop_cols else []
+        self.max_cardinality = max_cardinality
+        self.sparse = sparse
+        self.timings: Dict[str, float] = {}
+        self.fitted_ = False
+
+    @contextmanager
+    def _stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - t0
+
+    # ---------- fit ----------
+
+    def fit(self, df: pd.DataFrame) -> "TabularPreprocessor":
+        self.timings = {}
+        self._fit(df)
+        return self
+
+    def _fit(self, df: pd.DataFrame) -> None:
+        with self._stage("select"):
+            columns = [c for c in df.columns if c not in set(self.drop_cols)]
+            cat_all = [c for c in columns if _is_categorical(df[c].dtype)]
+            counts = {c: df[c].value_counts() for c in cat_all}
+            cat_cols = cat_all
+            if self.max_cardinality is not None:
+                cat_cols = [c for c in cat_all if len(counts[c]) <= self.max_cardinality]
+            plain = [c for c in columns if c not in set(cat_all)]
+
+        with self._stage("group"):
+            # نفس ترتيب get_dummies: الفئات مرتبة كما يرتبها Categorical
+            categories = {}
+            for c in cat_cols:
+                vc = counts[c]
+                if self.group_top and self.group_top > 0:
+                    top = list(vc.index[:self.group_top])
+                    # كل قيمة خارج الأعلى تكرارًا (بما فيها NaN) تصبح OTHER
+                    if vc.iloc[self.group_top:].sum() > 0 or df[c].isna().any():
+                        top.append(OTHER)
+                    values = top
+                else:
+                    values = list(vc.index)
+                categories[c] = [_plain(v) for v in pd.Categorical(values).categories]
+
+        dummy_names = [f"{c}_{v}" for c in cat_cols for v in categories[c]]
+        numeric_plain = [c for c in plain if _is_number(df[c].dtype)]
+        target = self.target
+        if target is not None:
+            if target not in plain and target not in dummy_names:
+                raise RuntimeError(f"Target column '{target}' not found in CSV after encoding")
+        else:
+            if not numeric_plain:
+                raise RuntimeError('No numeric columns found to use as target')
+            target = numeric_plain[-1]
+        x_plain = [c for c in plain if c != target]
+        if self.drop_numeric_features:
+            x_plain = [c for c in x_plain if c not in set(numeric_plain)]
+
+        with self._stage("impute"):
+            numeric_x = [c for c in x_plain if c in set(numeric_plain)]
+            means = df[numeric_x].mean() if numeric_x else pd.Series(dtype=float)
+            y_median = None
+            if target in plain and _is_number(df[target].dtype):
+                y_median = _plain(df[target].median())
+
+        sparse = self.sparse
+        if sparse is None:
+            n_dense = len(x_plain) + len(cat_cols)
+            total = len(x_plain) + len(dummy_names)
+            density = n_dense / max(total, 1)
+            sparse = bool(cat_cols) and len(df) * total >= SPARSE_MIN_CELLS and density <= SPARSE_MAX_DENSITY
+
+        self.cat_cols_ = cat_cols
+        self.categories_ = categories
+        self.target_ = target
+        self.x_plain_ = x_plain
+        self.means_ = {str(c): _plain(v) for c, v in means.items()}
+        self.y_median_ = y_median
+        self.sparse_ = sparse
+        self.columns_ = [str(c) for c in x_plain] + [n for n in dummy_names if n != target]
+        self.fitted_ = True
+
+    # ---------- transform ----------
+
+    def transform(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[pd.Series]]:
+        """(X, y) for ``df``; y is None when the target column is absent (new data to score)."""
+        if not self.fitted_:
+            raise RuntimeError("TabularPreprocessor is not fitted")
+        self.timings = {}
+        return self._transform(df)
+
+    def fit_transform(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[pd.Series]]:
+        self.timings = {}
+        self._fit(df)
+        return self._transform(df)
+
+    def _codes(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Row and column indices of every one-hot entry, across all categorical columns."""
+        rows, cols = [], []
+        offset = 0
+        for c in self.cat_cols_:
+            cats = self.categories_[c]
+            codes = pd.Categorical(df[c], categories=cats).codes.astype(np.int64)
+            if self.group_top and self.group_top > 0 and OTHER in cats:
+                codes[codes < 0] = cats.index(OTHER)
+            present = np.flatnonzero(codes >= 0)
+            rows.append(present)
+            cols.append(codes[present] + offset)
+            offset += len(cats)
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def _transform(self, df: pd.DataFrame):
+        n = len(df)
+        dummy_names = [f"{c}_{v}" for c in self.cat_cols_ for v in self.categories_[c]]
+        with self._stage("group"):
+            rows, cols = self._codes(df)
+
+        with self._stage("encode"):
+            y = None
+            target_dummy = None
+            if self.target_ in dummy_names:
+                target_dummy = dummy_names.index(self.target_)
+                hit = cols == target_dummy
+                y_values = np.zeros(n, dtype=bool)
+                y_values[rows[hit]] = True
+                y = pd.Series(y_values, index=df.index, name=self.target_)
+                rows, cols = rows[~hit], cols[~hit]
+                cols = cols - (cols > target_dummy)
+            elif self.target_ in df.columns:
+                y = df[self.target_]
+            n_dummies = len(dummy_names) - (target_dummy is not None)
+            # reindex: نسخة مستقلة؛ عمود غائب في بيانات جديدة يصبح NaN ثم يُعوَّض بالمتوسط
+            X_plain = df.reindex(columns=self.x_plain_)
+            if self.sparse_:
+                dummies = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n_dummies))
+            else:
+                dummies = np.zeros((n, n_dummies), dtype=bool)
+                dummies[rows, cols] = True
+
+        with self._stage("impute"):
+            # X_plain نسخة جديدة من df، فالتعويض يتم في مكانه بتمريرة واحدة
+            missing = [c for c in self.means_ if c in X_plain.columns and X_plain[c].isna().any()]
+            if missing:
+                X_plain[missing] = X_plain[missing].fillna({c: self.means_[c] for c in missing})
+            if y is not None and self.y_median_ is not None and y.isna().any():
+                y = y.fillna(self.y_median_)
+
+        with self._stage("align"):
+            # الأعمدة الوهمية لا تحوي NaN، فالفحص على الأعمدة العادية فقط
+            valid = X_plain.notna().all(axis=1).to_numpy()
+            if y is not None:
+                valid &= y.notna().to_numpy()
+            keep = None if valid.all() else np.flatnonzero(valid)
+            index = df.index if keep is None else df.index[keep]
+            if self.sparse_:
+                plain_block = sp.csr_matrix(X_plain.to_numpy(dtype=np.float64))
+                matrix = sp.hstack([plain_block, dummies], format='csr', dtype=np.float64)
+                if keep is not None:
+                    matrix = matrix[keep]
+                X = pd.DataFrame.sparse.from_spmatrix(matrix, index=index, columns=self.columns_)
+            else:
+                X = pd.concat([X_plain, pd.DataFrame(dummies, index=df.index, columns=self.columns_[len(self.x_plain_):])], axis=1)
+                if keep is not None:
+                    X = X.iloc[keep]
+            if y is not None and keep is not None:
+                y = y.iloc[keep]
+        return X, y
+
+    # ---------- serialization ----------
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.fitted_:
+            raise RuntimeError("TabularPreprocessor is not fitted")
+        return {
+            "params": {
+                "group_top": self.group_top,
+                "drop_numeric_features": self.drop_numeric_features,
+                "target": self.target,
+                "drop_cols": self.drop_cols,
+                "max_cardinality": self.max_cardinality,
+                "sparse": self.sparse
+            },
+            "cat_cols": [str(c) for c in self.cat_cols_],
+            "categories": {str(c): v for c, v in self.categories_.items()},
+            "target": self.target_,
+            "x_plain": [str(c) for c in self.x_plain_],
+            "means": self.means_,
+            "y_median": self.y_median_,
+            "sparse": self.sparse_,
+            "columns": self.columns_
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "TabularPreprocessor":
+        pre = cls(**state["params"])
+        pre.cat_cols_ = state["cat_cols"]
+        pre.categories_ = state["categories"]
+        pre.target_ = state["target"]
+        pre.x_plain_ = state["x_plain"]
+        pre.means_ = state["means"]
+        pre.y_median_ = state["y_median"]
+        pre.sparse_ = state["sparse"]
+        pre.columns_ = state["columns"]
+        pre.fitted_ = True
+        return pre
+
+    def save(self, path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict()))
+
+    @classmethod
+    def load(cls, path) -> "TabularPreprocessor":
+        return cls.from_dict(json.loads(Path(path).read_text()))
@@ -0,0 +1,102 @@
+"""
+Opt-in cProfile capture for a single run.
+
+cProfile only sees the thread it is enabled in, so every participant of a run
+writes its own .prof file into one parts directory: the job thread
+(RunProfiler), comparison threads (profiled()) and pool worker processes
+(worker_profiled(), one cumulative profile per process). RunProfiler.stop()
+merges them into profile.prof (loadable with pstats / snakeviz) and a text
+report. Nothing here runs unless a parts directory is passed.
+"""
+import cProfile
+import io
+import os
+import pstats
+import shutil
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROFILE_FILE = "profile.prof"
+REPORT_FILE = "profile.txt"
+TOP_FUNCTIONS = 20
+
+# ملف واحد تراكمي لكل عملية عاملة
+_WORKER_PROFILER = None
+
+@contextmanager
+def profiled(parts_dir: Optional[str], name: str):
+    """Profile the enclosed block in the calling thread into ``parts_dir`` (no-op when it is None)."""
+    if parts_dir is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(os.path.join(parts_dir, f"{name}-{uuid.uuid4().hex[:8]}.prof"))
+
+def worker_profiled(parts_dir: str, fn: Callable, *args):
+    """Run ``fn(*args)`` in a pool worker under the process-wide profiler and refresh its dump."""
+    global _WORKER_PROFILER
+    if _WORKER_PROFILER is None:
+        _WORKER_PROFILER = cProfile.Profile()
+    _WORKER_PROFILER.enable()
+    try:
+        return fn(*args)
+    finally:
+        _WORKER_PROFILER.disable()
+        _WORKER_PROFILER.dump_stats(os.path.join(parts_dir, f"worker-{os.getpid()}.prof"))
+
+def _top(stats: pstats.Stats, key: int, n: int) -> List[Dict[str, Any]]:
+    # stats.stats: (file, line, function) -> (primitive calls, calls, tottime, cumtime, callers)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][key], reverse=True)[:n]
+    return [
+        {"function": f"{func} ({os.path.basename(file)}:{line})", "calls": nc,
+         "tottime": round(tt, 6), "cumtime": round(ct, 6)}
+        for (file, line, func), (cc, nc, tt, ct, callers) in rows
+    ]
+
+class RunProfiler:
+    """Profiles one run: the calling thread plus every part written into ``parts_dir``."""
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = Path(out_dir)
+        self.parts_dir = self.out_dir / f"profile_parts-{uuid.uuid4().hex[:8]}"
+        self._profiler = cProfile.Profile()
+        self._running = False
+
+    def start(self) -> "RunProfiler":
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+        self._profiler.enable()
+        self._running = True
+        return self
+
+    def stop(self, top: int = TOP_FUNCTIONS) -> Optional[Dict[str, Any]]:
+        """Merge all parts into profile.prof / profile.txt; returns the top functions (None if already stopped)."""
+        if not self._running:
+            return None
+        self._profiler.disable()
+        self._running = False
+        try:
+            self._profiler.dump_stats(str(self.parts_dir / "job.prof"))
+            parts = sorted(str(p) for p in self.parts_dir.glob("*.prof"))
+            stats = pstats.Stats(*parts)
+            stats.dump_stats(str(self.out_dir / PROFILE_FILE))
+            report = io.StringIO()
+            pstats.Stats(str(self.out_dir / PROFILE_FILE), stream=report).sort_stats("cumulative").print_stats(100)
+            (self.out_dir / REPORT_FILE).write_text(report.getvalue())
+            return {
+                "sources": {
+                    "threads": sum(not Path(p).name.startswith("worker-") for p in parts),
+                    "worker_processes": sum(Path(p).name.startswith("worker-") for p in parts)
+                },
+                "total_seconds": stats.total_tt,
+                "top_cumulative": _top(stats, 3, top),
+                "top_tottime": _top(stats, 2, top)
+            }
+        finally:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
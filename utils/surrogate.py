@@ -0,0 +1,97 @@
+"""
+Learned fitness model for surrogate-assisted GA runs.
+
+After each generation the surrogate is refitted on every genome the GA has
+scored so far (bit vector -> fitness). The GA then breeds a candidate pool
+several times larger than the population, and screen() keeps only the
+candidates with the best predicted fitness (plus a few random ones, so the
+model's blind spots still get sampled) for real cross-validation. accuracy()
+compares the predictions with the fitness they later received.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from scipy.stats import spearmanr
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+SURROGATE_MODELS = ("ridge", "random_forest")
+# آخر الجينومات المقيَّمة فقط: الأحدث أقرب للمنطقة التي يبحث فيها GA
+MAX_TRAIN = 2000
+
+def _keys(genomes: np.ndarray) -> List[bytes]:
+    return [row.tobytes() for row in np.packbits(genomes, axis=1)]
+
+class FitnessSurrogate:
+    """Ridge or random-forest regression from genome bits to fitness."""
+
+    def __init__(self, kind: str = "ridge", seed: Optional[int] = None, max_train: int = MAX_TRAIN):
+        if kind not in SURROGATE_MODELS:
+            raise ValueError(f"Unknown surrogate model: {kind}")
+        self.kind = kind
+        self.seed = seed
+        self.max_train = max_train
+        self.model = None
+        self.n_train = 0
+
+    def fit(self, genomes: np.ndarray, values: np.ndarray) -> bool:
+        """Refit on the scored genomes (failed evaluations excluded); False when there is too little data."""
+        finite = np.isfinite(values)
+        genomes, values = genomes[finite][-self.max_train:], values[finite][-self.max_train:]
+        if len(values) < 4 or np.ptp(values) == 0:
+            return False
+        if self.kind == "ridge":
+            model = Ridge(alpha=1.0)
+        else:
+            model = RandomForestRegressor(n_estimators=50, min_samples_leaf=2, n_jobs=1, random_state=self.seed)
+        self.model = model.fit(genomes, values)
+        self.n_train = len(values)
+        return True
+
+    def screen(
+        self,
+        candidates: np.ndarray,
+        n: int,
+        known: Callable[[bytes], Optional[float]],
+        explore: float = 0.1,
+        rng=np.random
+    ) -> Tuple[np.ndarray, Dict[bytes, float]]:
+        """The ``n`` most promising distinct candidates and the predictions made for the unscored ones.
+
+        Candidates with a known fitness (``known(key)`` not None) are ranked by
+        it instead of a prediction. A fraction ``explore`` of the slots is
+        filled at random from the candidates that did not make the cut.
+        """
+        keys = _keys(candidates)
+        _, first = np.unique(np.asarray(keys, dtype=object), return_index=True)
+        first = np.sort(first)
+        if len(first) < n:
+            # مجموعة فقيرة بالتنوع: يُكمَل العدد من النسخ المكررة
+            first = np.concatenate([first, np.setdiff1d(np.arange(len(candidates)), first)[:n - len(first)]])
+        pool = candidates[first]
+        pool_keys = [keys[i] for i in first]
+        scores = self.model.predict(pool).astype(float)
+        predicted = np.ones(len(pool), dtype=bool)
+        for i, key in enumerate(pool_keys):
+            value = known(key)
+            if value is not None:
+                scores[i] = value
+                predicted[i] = False
+        order = np.argsort(scores, kind="stable")
+        n_explore = min(int(round(explore * n)), len(pool) - n)
+        chosen = order[:n - n_explore]
+        if n_explore > 0:
+            chosen = np.concatenate([chosen, rng.choice(order[n - n_explore:], size=n_explore, replace=False)])
+        predictions = {pool_keys[i]: float(scores[i]) for i in chosen if predicted[i]}
+        return pool[chosen], predictions
+
+    @staticmethod
+    def accuracy(predictions: Dict[bytes, float], actual: Callable[[bytes], Optional[float]]) -> Dict[str, Any]:
+        """Spearman rank correlation and mean absolute error of predictions against the fitness later measured."""
+        pairs = [(p, actual(k)) for k, p in predictions.items()]
+        pairs = np.asarray([(p, a) for p, a in pairs if a is not None and np.isfinite(a)], dtype=float)
+        result = {"n": len(pairs), "spearman": None, "mae": None}
+        if len(pairs) >= 2:
+            result["mae"] = float(np.mean(np.abs(pairs[:, 0] - pairs[:, 1])))
+            if np.ptp(pairs[:, 0]) > 0 and np.ptp(pairs[:, 1]) > 0:
+                result["spearman"] = float(spearmanr(pairs[:, 0], pairs[:, 1]).correlation)
+        return result
@@ -0,0 +1,91 @@
+"""
+Lightweight timing helpers shared by the GA and the API.
+
+StageTimer accumulates wall time per named stage. LatencyHistogram counts
+durations in fixed, Prometheus-style buckets, so per-evaluation latencies can
+be reported (and merged into /metrics) without keeping every sample.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Sequence
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class StageTimer:
+    """Seconds per stage; a stage entered more than once accumulates."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+class LatencyHistogram:
+    """Bucketed durations: count, sum and cumulative counts per upper bound (``le``)."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float, n: int = 1) -> None:
+        """Add ``n`` observations of ``seconds`` each."""
+        self.counts[bisect_left(self.buckets, seconds)] += n
+        self.count += n
+        self.sum += seconds * n
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.buckets != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, ending with ``+Inf``."""
+        total = 0
+        out = []
+        for le, c in zip(self.buckets + (float("inf"),), self.counts):
+            total += c
+            out.append((le, total))
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_seconds": self.sum,
+            "mean_seconds": self.sum / self.count if self.count else None,
+            "buckets": {("+Inf" if le == float("inf") else repr(le)): c for le, c in self.cumulative()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        bounds = [float(k) for k in data["buckets"] if k != "+Inf"]
+        hist = cls(bounds)
+        previous = 0
+        for i, c in enumerate(data["buckets"].values()):
+            hist.counts[i] = c - previous
+            previous = c
+        hist.count = data["count"]
+        hist.sum = data["sum_seconds"]
+        return hist
+
+def timed_batches(evaluate: Callable, histogram: LatencyHistogram) -> Callable:
+    """Wrap a batch evaluator so each call adds its per-genome mean latency to ``histogram``."""
+    def wrapper(genomes):
+        t0 = time.perf_counter()
+        values = evaluate(genomes)
+        if len(genomes):
+            histogram.observe((time.perf_counter() - t0) / len(genomes), len(genomes))
+        return values
+    return wrapper
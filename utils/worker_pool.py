@@ -0,0 +1,135 @@
+"""
+Persistent process pool for GA fitness evaluation.
+
+The feature matrix is written once as a contiguous float64 .npy file (on
+/dev/shm when available) and memory-mapped by every worker, so after the pool
+starts only packed genome bitmasks travel between processes. Sparse matrices
+are written as a CSC .npz instead and loaded once per worker.
+"""
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+import logging
+import numpy as np
+import scipy.sparse as sp
+from joblib import effective_n_jobs
+from joblib.externals.loky import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SHM_DIR = "/dev/shm"
+
+# حالة كل عملية عاملة: تُملأ مرة واحدة في initializer
+_WORKER_STATE = {}
+
+def _shared_dtype(X):
+    # DataFrame => dtypes لكل عمود؛ مصفوفة => dtype واحد
+    dtypes = X.dtypes if hasattr(X, "dtypes") else [X.dtype]
+    return np.float32 if all(t == np.float32 for t in dtypes) else np.float64
+
+def share_array(X) -> Tuple[str, str]:
+    """Write ``X`` once as a float64 .npy (CSC .npz if sparse) for workers; returns (tmpdir, path).
+
+    float32 input (a job under a memory budget) stays float32.
+    """
+    tmpdir = tempfile.mkdtemp(prefix="ga_pool_", dir=SHM_DIR if os.path.isdir(SHM_DIR) else None)
+    dtype = _shared_dtype(X)
+    if sp.issparse(X):
+        x_path = os.path.join(tmpdir, "X.npz")
+        sp.save_npz(x_path, sp.csc_matrix(X, dtype=dtype), compressed=False)
+        return tmpdir, x_path
+    x_path = os.path.join(tmpdir, "X.npy")
+    np.save(x_path, np.ascontiguousarray(np.asarray(X, dtype=dtype)))
+    return tmpdir, x_path
+
+def load_shared(x_path: str):
+    """Counterpart of share_array(): memory-mapped ndarray or CSC matrix."""
+    if x_path.endswith(".npz"):
+        return sp.load_npz(x_path).tocsc()
+    return np.load(x_path, mmap_mode='r')
+
+def _init_worker(x_path, y, model_factory, cv, scoring, max_samples, lambda_penalty, low_fidelity=None,
+                 profile_dir=None):
+    X = load_shared(x_path)
+    _WORKER_STATE.update(
+        profile_dir=profile_dir,
+        X=X,
+        y=y,
+        model_factory=model_factory,
+        cv=cv,
+        scoring=scoring,
+        max_samples=max_samples,
+        lambda_penalty=lambda_penalty
+    )
+    if low_fidelity is not None:
+        # العينة الصغيرة تُنسخ إلى الذاكرة مرة واحدة لكل عملية
+        rows, low_cv = low_fidelity
+        X_low = X[rows]
+        _WORKER_STATE.update(X_low=X_low if sp.issparse(X_low) else np.asarray(X_low), y_low=y[rows], cv_low=low_cv)
+
+def _evaluate_chunk(packed: np.ndarray, n_features: int, low: bool = False) -> List[float]:
+    if _WORKER_STATE["profile_dir"] is not None:
+        from .profiling import worker_profiled
+        return worker_profiled(_WORKER_STATE["profile_dir"], _evaluate_genomes, packed, n_features, low)
+    return _evaluate_genomes(packed, n_features, low)
+
+def _evaluate_genomes(packed: np.ndarray, n_features: int, low: bool) -> List[float]:
+    from .ga_optimized import fitness
+    s = _WORKER_STATE
+    genomes = np.unpackbits(packed, axis=1, count=n_features)
+    X, y, cv = (s["X_low"], s["y_low"], s["cv_low"]) if low else (s["X"], s["y"], s["cv"])
+    return [
+        fitness(g, X, y, s["model_factory"], cv, s["scoring"], s["max_samples"], s["lambda_penalty"])
+        for g in genomes
+    ]
+
+class FitnessPool:
+    def __init__(
+        self,
+        X,
+        y,
+        model_factory: Callable,
+        cv: int = 5,
+        scoring: str = 'neg_mean_squared_error',
+        max_samples: int = 5000,
+        lambda_penalty: float = 0.05,
+        n_jobs: int = -1,
+        chunks_per_worker: int = 2,
+        low_fidelity: Optional[Tuple[np.ndarray, Any]] = None,
+        profile_dir: Optional[str] = None
+    ):
+        """``low_fidelity`` is an optional ``(row indices, cv splitter)`` pair for ``evaluate(..., low=True)``;
+        with ``profile_dir`` every worker dumps a cumulative cProfile there (see utils/profiling.py)."""
+        self.n_workers = effective_n_jobs(n_jobs)
+        self.n_features = X.shape[1]
+        self.chunks_per_worker = chunks_per_worker
+
+        self._tmpdir, x_path = share_array(X)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            initializer=_init_worker,
+            initargs=(x_path, np.asarray(y), model_factory, cv, scoring, max_samples, lambda_penalty, low_fidelity,
+                      profile_dir)
+        )
+        logger.info(f"Fitness pool started: workers={self.n_workers}, data={x_path}")
+
+    def evaluate(self, genomes: Sequence[np.ndarray], low: bool = False) -> List[float]:
+        if len(genomes) == 0:
+            return []
+        packed = np.packbits(np.asarray(genomes, dtype=np.uint8), axis=1)
+        n_chunks = min(len(packed), self.n_workers * self.chunks_per_worker)
+        chunks = np.array_split(packed, n_chunks)
+        results = self._executor.map(_evaluate_chunk, chunks, [self.n_features] * n_chunks, [low] * n_chunks)
+        return [f for chunk in results for f in chunk]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()